@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+import os
+import threading
+import contact_store
+import feed_cache
+import metrics
+
+# --- CONFIGURATION ---
+HIT_TTL = 30 * 24 * 3600         # A published address rarely changes.
+MISS_TTL = 3 * 24 * 3600         # A page without one is checked again sooner.
+MAX_ENTRIES = int(os.getenv('AUTHOR_CACHE_SIZE', 20000))
+EVICT_EVERY = 500                # Writes between LRU trims.
+
+class AuthorPageCache:
+    """
+    What each author bio page yielded, kept in the contact store so it
+    survives between runs: the email, or the fact that there was none.
+    Bylines from one outlet, name variants and writers who freelance for
+    several outlets all lead to the same few pages, so a repeat lookup is a
+    database read instead of another page load. Pages are keyed by
+    normalized URL; the least recently used are dropped past MAX_ENTRIES.
+    Safe to share between lookup threads and the browser pool.
+    """
+    def __init__(self, filename=contact_store.STORE_FILE, hit_ttl=HIT_TTL, miss_ttl=MISS_TTL,
+                 max_entries=MAX_ENTRIES):
+        self.store = contact_store.ContactStore(filename, threaded=True)
+        self.hit_ttl = hit_ttl
+        self.miss_ttl = miss_ttl
+        self.max_entries = max_entries
+        self.hits = self.misses = self._writes = 0
+        self._lock = threading.Lock()
+        with self._lock:
+            self.store.evict_author_pages(self.max_entries)
+
+    def close(self):
+        with self._lock:
+            self.store.close()
+
+    def get(self, url):
+        """(found, email): found is False on a miss; email is None for a page known to have none."""
+        with self._lock:
+            found, email = self.store.get_author_page(feed_cache.normalize_article_url(url))
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+        metrics.count('author_cache_lookups', result=('hit' if email else 'negative_hit') if found else 'miss')
+        return found, email
+
+    def put(self, url, email):
+        with self._lock:
+            self.store.put_author_page(feed_cache.normalize_article_url(url), email,
+                                       self.hit_ttl if email else self.miss_ttl)
+            self._writes += 1
+            if self._writes % EVICT_EVERY == 0:
+                self.store.evict_author_pages(self.max_entries)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def describe(self):
+        return f"{self.hits} hits of {self.hits + self.misses} lookups ({self.hit_rate():.0%})"
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: streaming feed_parser.iter_leads vs. the BeautifulSoup
+parser monitor.py used before it.
+
+    python3 benchmarks/bench_feed_parser.py                      # synthetic feeds
+    python3 benchmarks/bench_feed_parser.py --record feeds/      # save today's live feeds
+    python3 benchmarks/bench_feed_parser.py --feeds feeds/       # replay recorded feeds
+    python3 benchmarks/bench_feed_parser.py --json results.json
+
+Each feed is parsed twice per parser: "cold" (nothing seen yet) and "warm"
+(everything except the newest NEW_ITEMS items already processed, which is
+what a normal cron tick looks like).
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bs4 import BeautifulSoup
+import feed_cache
+import feed_parser
+
+NEW_ITEMS = 3
+REPEATS = 5
+SYNTHETIC_SIZES = [50, 500, 5000]
+
+def baseline_parse(content, seen_articles=None):
+    """The tree-building parser from before the streaming change, kept as the reference."""
+    leads = []
+    soup = BeautifulSoup(content, 'xml')
+    for article in soup.find_all('item'):
+        author_tag = article.find('dc:creator') or article.find('author')
+        link_tag = article.find('link')
+        title_tag = article.find('title')
+        guid_tag = article.find('guid')
+        if not (author_tag and author_tag.string and link_tag and link_tag.string and title_tag and title_tag.string):
+            continue
+        article_link = link_tag.string.strip()
+        article_guid = guid_tag.string.strip() if guid_tag and guid_tag.string else None
+        if seen_articles is not None and seen_articles.is_seen(article_link, article_guid):
+            continue
+        for name in re.split(r'\s*,\s*|\s+and\s+', author_tag.string.strip()):
+            if name.strip():
+                leads.append({'name': name.strip(), 'link': article_link, 'title': title_tag.string.strip()})
+    return leads
+
+def streaming_parse(content, seen_articles=None):
+    return list(feed_parser.iter_leads(io.BytesIO(content), seen_articles))
+
+class MemorySeen:
+    """In-memory stand-in for feed_cache.SeenArticles, so the benchmark doesn't time SQLite."""
+    def __init__(self, links):
+        self.keys = set()
+        for link in links:
+            self.keys |= feed_cache.article_keys(link)
+
+    def is_seen(self, link, guid=None):
+        return bool(feed_cache.article_keys(link, guid) & self.keys)
+
+    def add(self, link, guid=None):
+        pass    # Read-only, so every repeat parses the same feed.
+
+def synthetic_feed(items, body_words=400):
+    """A Postmedia-shaped feed: dc:creator bylines and full article bodies in content:encoded."""
+    body = ' '.join(['Lorem ipsum dolor sit amet, consectetur adipiscing elit.'] * (body_words // 8))
+    entries = []
+    for i in range(items):
+        entries.append(
+            f"<item><title>Story {i}</title><link>https://example.com/news/story-{i}?utm_source=rss</link>"
+            f"<guid isPermaLink=\"false\">https://example.com/?p={i}</guid>"
+            f"<dc:creator><![CDATA[Reporter {i % 97} and Writer {i % 89}]]></dc:creator>"
+            f"<pubDate>Mon, 06 Oct 2025 12:{i % 60:02d}:00 +0000</pubDate>"
+            f"<content:encoded><![CDATA[<p>{body}</p>]]></content:encoded></item>")
+    return ('<?xml version="1.0" encoding="UTF-8"?>'
+            '<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/" '
+            'xmlns:content="http://purl.org/rss/1.0/modules/content/"><channel><title>Example</title>'
+            + ''.join(entries) + '</channel></rss>').encode('utf-8')
+
+def record_feeds(directory):
+    import monitor
+    import feed_fetcher
+    os.makedirs(directory, exist_ok=True)
+    session = feed_fetcher.create_session(monitor.HEADERS)
+    for outlet, response, error in feed_fetcher.FeedFetcher(session).fetch_all(monitor.OUTLET_SOURCES):
+        if error:
+            print(f"  ! {outlet['outlet']}: {error}")
+            continue
+        name = re.sub(r'[^a-z0-9]+', '-', outlet['outlet'].lower()).strip('-')
+        with open(os.path.join(directory, f"{name}.xml"), 'wb') as f:
+            f.write(response.content)
+        print(f"  recorded {outlet['outlet']} ({len(response.content)} bytes)")
+
+def item_links(content):
+    return [lead['link'] for lead in streaming_parse(content)]
+
+def measure(parse, content, seen):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        leads = parse(content, seen)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    parse(content, seen)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'median_ms': round(statistics.median(timings) * 1000, 2), 'peak_kb': round(peak / 1024, 1),
+            'leads': len(leads)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--feeds', help="directory of recorded *.xml feeds")
+    parser.add_argument('--record', metavar='DIR', help="download every OUTLET_SOURCES feed into DIR and exit")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    if args.record:
+        record_feeds(args.record)
+        return
+
+    if args.feeds:
+        corpus = {os.path.basename(path): open(path, 'rb').read()
+                  for path in sorted(glob.glob(os.path.join(args.feeds, '*.xml')))}
+    else:
+        corpus = {f"synthetic-{n}": synthetic_feed(n) for n in SYNTHETIC_SIZES}
+
+    results = []
+    print(f"{'feed':<28}{'KB':>8}  {'parser':<10}{'cold ms':>10}{'warm ms':>10}{'cold peak KB':>14}{'warm peak KB':>14}")
+    for name, content in corpus.items():
+        links = list(dict.fromkeys(item_links(content)))
+        warm_seen = MemorySeen(links[NEW_ITEMS:])
+        for label, parse in (('bs4', baseline_parse), ('streaming', streaming_parse)):
+            cold = measure(parse, content, None)
+            warm = measure(parse, content, warm_seen)
+            results.append({'feed': name, 'bytes': len(content), 'parser': label, 'cold': cold, 'warm': warm})
+            print(f"{name[:27]:<28}{len(content) / 1024:>8.0f}  {label:<10}{cold['median_ms']:>10}{warm['median_ms']:>10}"
+                  f"{cold['peak_kb']:>14}{warm['peak_kb']:>14}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
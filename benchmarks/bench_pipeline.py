@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark: one monitor.Monitor.run_cycle (feeds -> email
+discovery -> Sheets sync) and one validate_emails.validate, replayed offline.
+
+A corpus of feeds, article pages and author pages is served from a local
+HTTP server; every request the pipeline makes is routed there instead of to
+the real site. The email verifier, DNS and Google Sheets are replaced by
+local fakes with a fixed latency, so no credits are spent and nothing is
+uploaded. The store, feed cache and metrics go to a throwaway directory.
+
+    python3 benchmarks/bench_pipeline.py                          # synthetic corpus
+    python3 benchmarks/bench_pipeline.py --record corpus/         # save today's live pages
+    python3 benchmarks/bench_pipeline.py --corpus corpus/         # replay a recorded corpus
+    python3 benchmarks/bench_pipeline.py --json after.json --compare before.json
+
+Each stage reports items, throughput and latency percentiles: "feeds" is
+everything run_cycle does before the lookup queue (staff directories, feed
+download and streamed parse, dedupe), "sync" is every Sheets upload of both
+calls. --compare exits with status 1 if any stage got more than
+REGRESSION_THRESHOLD slower. The browser tier is off: only what can be
+replayed over HTTP is measured.
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote
+from requests.adapters import HTTPAdapter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Set before the pipeline modules are imported, since they read these at import time.
+WORKDIR = tempfile.mkdtemp(prefix='bench-pipeline-')
+os.environ['JOURNALIST_DB'] = os.path.join(WORKDIR, 'journalists.db')
+os.environ['METRICS_DIR'] = os.path.join(WORKDIR, 'metrics')
+os.environ['FEED_CACHE_FILE'] = os.path.join(WORKDIR, 'feed_cache.json')
+import domain_check
+import email_finder
+import email_formats
+import feed_fetcher
+import feed_parser
+import metrics
+import monitor
+import outlet_registry
+import sheets_outbox
+import validate_emails
+import validation_engine
+
+STAGES = ['feeds', 'discovery', 'validation', 'sync']
+SERVER_LATENCY_MS = 20       # Added to every page the local server returns.
+VERIFY_LATENCY_MS = 80       # Simulated verifier round trip.
+SHEETS_LATENCY_MS = 300      # Simulated append_rows round trip.
+REGRESSION_THRESHOLD = 0.20  # --compare flags stages this much slower than the baseline.
+CRAWL_RATE_PER_HOST = 1000   # The local server needs no politeness pacing.
+FIRST_NAMES = ['Jane', 'John', 'Amélie', 'Raj', 'Chen', 'Fatima', 'Liam', 'Olivia', 'Noah', 'Zoë',
+               'Marc', 'Priya', 'Kwame', 'Sofia', 'Ethan', 'Mei']
+LAST_NAMES = ['Doe', 'Tremblay', 'Singh', 'Nguyen', 'MacDonald', 'Roy', 'Wong', 'Gagnon', 'Brown',
+              "O'Neil", 'Côté', 'Ahmed', 'Martin', 'Lee']
+
+def silent(message, end='\n'):
+    pass
+
+# --- Corpus ---
+def _page(title, body):
+    return f"<!doctype html><html><head><title>{title}</title></head><body>{body}</body></html>"
+
+def synthetic_corpus(outlets=10, items=30, seed=0):
+    """Postmedia-shaped outlets: a feed, article pages with a byline link, and author bio pages."""
+    filler = '<p>' + ' '.join(['The council met on Tuesday to discuss the budget and the new transit line.'] * 8) + '</p>'
+    corpus = {'outlets': [], 'pages': {}}
+    for i in range(outlets):
+        host = f"outlet{i}.example"
+        outlet = {"outlet": f"Bench Outlet {i}", "url": f"https://{host}/", "location": "Benchmark",
+                  "rss_url": f"https://{host}/feed"}
+        corpus['outlets'].append(outlet)
+        entries = []
+        for j in range(items):
+            first = FIRST_NAMES[(i * 7 + j * 3 + seed) % len(FIRST_NAMES)]
+            last = LAST_NAMES[(i * 5 + j + seed) % len(LAST_NAMES)]
+            name = f"{first} {last}"
+            slug = '-'.join(email_formats._fold(part) for part in name.split())
+            article = f"https://{host}/news/story-{j}"
+            author_page = f"https://{host}/author/{slug}"
+            entries.append(f"<item><title>Story {j}</title><link>{article}?utm_source=rss</link>"
+                           f"<guid isPermaLink=\"false\">{host}-{j}</guid><dc:creator><![CDATA[{name}]]></dc:creator>"
+                           f"<pubDate>Mon, 06 Oct 2025 {23 - j % 24:02d}:00:00 +0000</pubDate></item>")
+            corpus['pages'][f"{article}?utm_source=rss"] = (
+                'text/html', _page(f"Story {j}", f"<h1>Story {j}</h1><p>By <a href=\"/author/{slug}\">{name}</a></p>{filler}"))
+            if zlib.crc32(f"{host}{name}".encode()) % 10 < 6:
+                contact = f"<a href=\"mailto:{email_formats._fold(first)}.{email_formats._fold(last)}@{host}\">Email {first}</a>"
+            else:
+                contact = "<p>Follow on social media.</p>"
+            corpus['pages'][author_page] = ('text/html', _page(name, f"<h1>{name}</h1>{filler}{contact}"))
+        corpus['pages'][outlet['rss_url']] = (
+            'application/rss+xml',
+            '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/">'
+            f"<channel><title>{outlet['outlet']}</title>{''.join(entries)}</channel></rss>")
+    return corpus
+
+def load_corpus(directory):
+    with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    pages = {}
+    for url, entry in manifest['pages'].items():
+        with open(os.path.join(directory, entry['file']), 'rb') as f:
+            pages[url] = (entry['content_type'], f.read())
+    return {'outlets': manifest['outlets'], 'pages': pages}
+
+class RecordingAdapter(HTTPAdapter):
+    """Keeps a copy of every successful response that passes through it."""
+    def __init__(self, pages, **kwargs):
+        super().__init__(**kwargs)
+        self.pages = pages
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if response.status_code == 200:
+            with self._lock:
+                self.pages[request.url] = (response.headers.get('Content-Type', 'text/html'), response.content)
+        return response
+
+def record_corpus(directory, items_per_feed):
+    """Runs the static pipeline against the live outlets and saves every page it reads."""
+    pages = {}
+    session = feed_fetcher.create_session(monitor.HEADERS)
+    adapter = RecordingAdapter(pages, pool_connections=64, pool_maxsize=monitor.EMAIL_LOOKUP_CONCURRENCY)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    finder = email_finder.EmailFinder(session, browser_pool_size=0, log=silent)
+    lookups = []
+    for outlet, response, error in feed_fetcher.FeedFetcher(session).fetch_all(monitor.OUTLET_SOURCES):
+        if error:
+            print(f"  ! {outlet['outlet']}: {error}")
+            continue
+        leads = list(feed_parser.iter_leads(io.BytesIO(response.content)))[:items_per_feed]
+        lookups += [(outlet, lead) for lead in leads]
+        print(f"  recorded {outlet['outlet']} feed, {len(leads)} bylines to follow")
+    with ThreadPoolExecutor(max_workers=monitor.EMAIL_LOOKUP_CONCURRENCY) as executor:
+        list(executor.map(lambda job: finder.find_static(job[1]['link'], job[1]['name']), lookups))
+
+    os.makedirs(directory, exist_ok=True)
+    manifest = {'outlets': monitor.OUTLET_SOURCES, 'pages': {}}
+    for url, (content_type, body) in pages.items():
+        name = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        with open(os.path.join(directory, name), 'wb') as f:
+            f.write(body)
+        manifest['pages'][url] = {'file': name, 'content_type': content_type}
+    with open(os.path.join(directory, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Saved {len(pages)} pages to {directory}")
+
+# --- Local replay ---
+def start_server(pages, latency_ms):
+    """Serves the corpus on a free localhost port. Paths are the quoted original URLs."""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            time.sleep(latency_ms / 1000)
+            entry = pages.get(unquote(self.path[1:]))
+            content_type, body = entry if entry else ('text/plain', 'not in corpus')
+            body = body.encode('utf-8') if isinstance(body, str) else body
+            self.send_response(200 if entry else 404)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+class ReplayAdapter(HTTPAdapter):
+    """Sends every request to the local server, whatever host it was meant for."""
+    def __init__(self, base_url, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url
+
+    def send(self, request, **kwargs):
+        request.url = self.base_url + quote(request.url, safe='')
+        return super().send(request, **kwargs)
+
+class FakeVerifier:
+    """Stands in for QuickEmailVerifier: fixed latency, deterministic verdicts."""
+    def __init__(self, latency_ms):
+        self.latency_ms = latency_ms
+        self.timings = []
+        self._lock = threading.Lock()
+
+    def __call__(self, email):
+        start = time.perf_counter()
+        time.sleep(self.latency_ms / 1000)
+        verdict = zlib.crc32(email.encode('utf-8')) % 10
+        body = {'result': 'valid' if verdict < 7 else 'invalid', 'reason': 'accepted_email' if verdict < 7 else 'rejected_email',
+                'accept_all': 'false'}
+        with self._lock:
+            self.timings.append(time.perf_counter() - start)
+        return body
+
+class FakeResolver:
+    """Stands in for domain_check.DnsResolver: every domain takes mail."""
+    def mail_status(self, domain):
+        return domain_check.OK, [domain]
+
+class FakeWorksheet:
+    def __init__(self, latency_ms):
+        self.latency_ms = latency_ms
+        self.rows = []
+        self.timings = []
+
+    def col_values(self, column):
+        return [row[column - 1] for row in self.rows if len(row) >= column]
+
+    def append_rows(self, rows, value_input_option=None):
+        start = time.perf_counter()
+        time.sleep(self.latency_ms / 1000)
+        self.rows.extend(rows)
+        self.timings.append(time.perf_counter() - start)
+
+class FakeSheetsClient:
+    """Stands in for sheets_client.GoogleSheetsClient."""
+    def __init__(self, latency_ms):
+        self.worksheet = FakeWorksheet(latency_ms)
+
+    def get_worksheet(self, worksheet_name):
+        return self.worksheet
+
+# --- Measurement ---
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, round(q / 100 * len(values) + 0.5) - 1))]
+
+def stage_stats(items, wall_seconds, latencies):
+    return {'items': items, 'seconds': round(wall_seconds, 3),
+            'per_sec': round(items / wall_seconds, 1) if wall_seconds else 0.0,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 1), 'p90_ms': round(percentile(latencies, 90) * 1000, 1),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+            'max_ms': round(max(latencies, default=0) * 1000, 1)}
+
+def clock(obj, method, spent):
+    """Wraps obj.method to add its wall time to spent[method], so one run_cycle can be split into stages."""
+    func = getattr(obj, method)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            spent[method] = spent.get(method, 0.0) + time.perf_counter() - start
+    setattr(obj, method, timed)
+
+def samples(name):
+    """Every latency the metrics registry kept for one timer, over all its labels."""
+    return [seconds for (timer_name, _), timer in metrics.registry.timers.items() if timer_name == name
+            for seconds in timer.samples]
+
+def run_pipeline(corpus, args):
+    server = start_server(corpus['pages'], args.server_latency)
+    registry_file = os.path.join(WORKDIR, 'outlets.json')
+    with open(registry_file, 'w', encoding='utf-8') as f:
+        json.dump({'regions': {'Benchmark': {'country': 'Canada'}},
+                   'outlets': [{**outlet, 'region': 'Benchmark'} for outlet in corpus['outlets']]}, f)
+    registry = outlet_registry.OutletRegistry(registry_file)
+    monitor.FEED_CONCURRENCY = args.feed_concurrency
+    monitor.EMAIL_LOOKUP_CONCURRENCY = args.lookup_concurrency
+    monitor.BROWSER_POOL_SIZE = 0
+    validate_emails.VERIFY_WORKERS = args.verify_workers
+    validate_emails.VERIFY_RATE_PER_SEC = args.verify_rate
+    with contextlib.redirect_stdout(io.StringIO()):
+        runner = monitor.Monitor(registry, job='bench-pipeline')
+    pool_size = max(args.feed_concurrency, args.lookup_concurrency)
+    adapter = ReplayAdapter(f"http://127.0.0.1:{server.server_address[1]}/", pool_connections=4, pool_maxsize=pool_size)
+    runner.session.mount('http://', adapter)
+    runner.session.mount('https://', adapter)
+    runner.scheduler.rate_per_host = CRAWL_RATE_PER_HOST
+    client = FakeSheetsClient(args.sheets_latency)
+    runner.syncer = sheets_outbox.SheetsSync(runner.store, client=client, log=silent)
+    verifier = FakeVerifier(args.verify_latency)
+    spent = {}
+    clock(runner.lookups, 'drain', spent)
+    clock(runner.syncer, 'sync', spent)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            runner.run_cycle(registry.outlets())
+            cycle_seconds = time.perf_counter() - start
+            cycle_sync = spent.get('sync', 0.0)
+            validate_emails.CREDIT_BUDGET = max(1, runner.store.count('pending'))
+            start = time.perf_counter()
+            validate_emails.validate(runner.store, runner.syncer, registry, verifier=verifier, resolver=FakeResolver())
+            validate_seconds = time.perf_counter() - start - (spent.get('sync', 0.0) - cycle_sync)
+    finally:
+        runner.close()
+        server.shutdown()
+
+    feed_timings, lookup_timings = samples('feed_fetch'), samples('email_lookup')
+    results = {
+        'feeds': stage_stats(len(feed_timings), cycle_seconds - spent.get('drain', 0.0) - cycle_sync, feed_timings),
+        'discovery': stage_stats(len(lookup_timings), spent.get('drain', 0.0), lookup_timings),
+        'validation': stage_stats(len(verifier.timings), validate_seconds, verifier.timings),
+        'sync': stage_stats(runner.syncer.uploaded, spent.get('sync', 0.0), client.worksheet.timings),
+    }
+    results['discovery']['found'] = metrics.registry.total('emails_found')
+    return results
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_file):
+    """Prints per-stage changes against an earlier --json file. Returns the regressed stages."""
+    with open(baseline_file, encoding='utf-8') as f:
+        baseline = json.load(f)['stages']
+    regressed = []
+    print(f"\nAgainst {baseline_file} (over {REGRESSION_THRESHOLD:+.0%} wall time = regression):")
+    for stage in STAGES:
+        if stage not in baseline or stage not in results:
+            continue
+        old, new = baseline[stage]['seconds'], results[stage]['seconds']
+        change = (new - old) / old if old else 0.0
+        flag = '  REGRESSION' if change > REGRESSION_THRESHOLD else ''
+        if flag:
+            regressed.append(stage)
+        print(f"  {stage:<12}{old:>9.3f}s -> {new:>9.3f}s  {change:>+7.1%}{flag}")
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', help="directory written by --record (default: synthetic corpus)")
+    parser.add_argument('--record', metavar='DIR', help="fetch the live outlets into DIR and exit")
+    parser.add_argument('--record-items', type=int, default=10, help="bylines to follow per feed when recording")
+    parser.add_argument('--outlets', type=int, default=10, help="synthetic outlets")
+    parser.add_argument('--items', type=int, default=30, help="synthetic items per feed")
+    parser.add_argument('--server-latency', type=float, default=SERVER_LATENCY_MS, help="ms added to every page")
+    parser.add_argument('--verify-latency', type=float, default=VERIFY_LATENCY_MS)
+    parser.add_argument('--sheets-latency', type=float, default=SHEETS_LATENCY_MS)
+    parser.add_argument('--feed-concurrency', type=int, default=feed_fetcher.DEFAULT_CONCURRENCY)
+    parser.add_argument('--lookup-concurrency', type=int, default=8)
+    parser.add_argument('--verify-workers', type=int, default=validation_engine.DEFAULT_WORKERS)
+    parser.add_argument('--verify-rate', type=float, default=validation_engine.DEFAULT_RATE_PER_SEC)
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--compare', metavar='JSON', help="earlier --json results to check for regressions")
+    args = parser.parse_args()
+
+    if args.record:
+        record_corpus(args.record, args.record_items)
+        return 0
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.outlets, args.items)
+    print(f"Corpus: {len(corpus['outlets'])} outlets, {len(corpus['pages'])} pages "
+          f"({args.corpus or 'synthetic'}).")
+    results = run_pipeline(corpus, args)
+
+    print(f"\n{'stage':<12}{'items':>7}{'seconds':>10}{'per sec':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage in STAGES:
+        r = results[stage]
+        print(f"{stage:<12}{r['items']:>7}{r['seconds']:>10}{r['per_sec']:>10}{r['p50_ms']:>10}"
+              f"{r['p90_ms']:>10}{r['p99_ms']:>10}{r['max_ms']:>10}")
+    print(f"Discovery found {results['discovery']['found']} of {results['discovery']['items']} emails on the page.")
+
+    if args.json:
+        report = {'meta': {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'), 'revision': git_revision(),
+                           'python': platform.python_version(), 'corpus': args.corpus or 'synthetic',
+                           'config': {k: v for k, v in vars(args).items() if k not in ('json', 'compare', 'record')}},
+                  'stages': results}
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        return 1 if compare(results, args.compare) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
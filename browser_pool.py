@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+import asyncio
+import re
+import threading
+import time
+from urllib.parse import urljoin
+import metrics
+
+# --- CONFIGURATION ---
+DEFAULT_POOL_SIZE = 4
+PAGE_TIMEOUT = 60000
+EMAIL_PATTERN = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+BLOCKED_RESOURCE_TYPES = ['image', 'stylesheet', 'font', 'media', 'csp_report']
+MAX_RELAUNCH_FAILURES = 3    # Consecutive failed page/browser relaunches before the pool gives up.
+
+class BrowserPoolBroken(RuntimeError):
+    """Chromium could not be relaunched; the pool takes no more lookups."""
+
+def _playwright():
+    """Playwright is imported when a pool starts, so runs that never open a browser don't pay for it."""
+    from playwright import async_api
+    return async_api
+
+async def block_unnecessary_resources(route):
+    """Intercepts network requests and blocks non-essential ones."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+class BrowserPool:
+    """
+    One long-lived Chromium process with a fixed number of reusable pages.
+
+    Playwright runs on its own event loop in a background thread, so callers
+    stay synchronous: find_email() returns a concurrent.futures.Future and up
+    to `size` lookups run at the same time. A page that crashes or whose
+    context dies is thrown away and replaced before it goes back in the pool.
+    """
+    def __init__(self, size=DEFAULT_POOL_SIZE, log=print, scheduler=None, cache=None):
+        self.size = max(1, size)
+        self.log = log
+        self.scheduler = scheduler
+        self.cache = cache
+        self._loop = asyncio.new_event_loop()
+        self._api = None
+        self._relaunch_failures = 0
+        self.broken = None
+        self._thread = None
+        self._playwright = None
+        self._browser = None
+        self._pages = None
+        self._started_at = None
+        self.page_loads = 0
+        self.recycled = 0
+
+    # --- Lifecycle ---
+    def start(self):
+        self._thread = threading.Thread(target=self._loop.run_forever, name='browser-pool', daemon=True)
+        self._thread.start()
+        try:
+            self._run(self._startup()).result()
+        except Exception:
+            self.close()
+            raise
+        self._started_at = time.monotonic()
+        self.log(f"Browser pool ready with {self.size} pages.")
+        return self
+
+    def close(self):
+        if not self._thread:
+            return
+        try:
+            self._run(self._shutdown()).result()
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def _startup(self):
+        self._api = _playwright()
+        self._playwright = await self._api.async_playwright().start()
+        self._browser = await self._playwright.chromium.launch()
+        self._pages = asyncio.Queue()
+        for _ in range(self.size):
+            await self._pages.put(await self._new_page())
+
+    async def _shutdown(self):
+        if self._browser:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _new_page(self):
+        if not self._browser.is_connected():
+            self.log("  -> Browser process died, relaunching.")
+            self._browser = await self._playwright.chromium.launch()
+        context = await self._browser.new_context()
+        await context.route('**/*', block_unnecessary_resources)
+        return await context.new_page()
+
+    async def _recycle(self, page):
+        """
+        Swaps a dead page for a fresh one. If that fails too, the old page is
+        returned so the pool never shrinks (the next lookup tries again), and
+        after MAX_RELAUNCH_FAILURES in a row the pool is marked broken.
+        """
+        self.recycled += 1
+        try:
+            await page.context.close()
+        except self._api.Error:
+            pass
+        try:
+            new_page = await self._new_page()
+        except Exception as e:
+            self._relaunch_failures += 1
+            self.log(f"  -> Could not replace browser page: {type(e).__name__}: {e}")
+            if self._relaunch_failures >= MAX_RELAUNCH_FAILURES:
+                self.broken = e
+            return page
+        self._relaunch_failures = 0
+        return new_page
+
+    # --- Lookups ---
+    def find_email(self, article_url, author_name):
+        """Queues an email search and returns a Future for the email (or None)."""
+        return self._run(self._find_email(article_url, author_name))
+
+    async def _goto(self, page, url):
+        if self.scheduler:
+            # The per-site wait blocks, so it runs off the event loop; other pages keep loading.
+            await asyncio.get_running_loop().run_in_executor(None, self.scheduler.acquire, url)
+        self.page_loads += 1
+        metrics.count('browser_page_loads')
+        await page.goto(url, timeout=PAGE_TIMEOUT, wait_until='domcontentloaded')
+
+    async def _find_email(self, article_url, author_name):
+        if self.broken:
+            raise BrowserPoolBroken(f"browser could not be relaunched: {self.broken}")
+        page = await self._pages.get()
+        recycled = False
+        try:
+            return await self._search_page(page, article_url, author_name)
+        except self._api.TimeoutError:
+            metrics.count('browser_timeouts')
+            self.log(f"  -> Page timed out, even with optimization. Skipping {author_name}.")
+        except self._api.Error as e:
+            metrics.count('browser_errors')
+            self.log(f"  -> An error occurred during headless browsing: {e}")
+            page, recycled = await self._recycle(page), True
+        finally:
+            # One relaunch attempt per lookup: a failed recycle hands back the (closed) old page.
+            if page.is_closed() and not recycled:
+                page = await self._recycle(page)
+            await self._pages.put(page)
+        return None
+
+    async def _search_page(self, page, article_url, author_name):
+        self.log(f"  -> Visiting article (Optimized): {article_url}")
+        await self._goto(page, article_url)
+
+        author_link = page.get_by_text(author_name, exact=False).first
+        author_page_url = None
+        if await author_link.count():
+            author_page_url = await author_link.get_attribute('href')
+        if author_page_url:
+            if 'mailto:' in author_page_url:
+                self.log("  -> SUCCESS! Found a direct mailto: link.")
+                return author_page_url.replace('mailto:', '').strip()
+            author_page_url = urljoin(article_url, author_page_url)
+            if self.scheduler and not await asyncio.get_running_loop().run_in_executor(
+                    None, self.scheduler.allowed, author_page_url):
+                return None
+            if self.cache:
+                found, email = self.cache.get(author_page_url)
+                if found:
+                    self.log(f"  -> Author page already checked: {author_page_url}")
+                    return email
+            self.log(f"  -> Found author page, navigating to: {author_page_url}")
+            await self._goto(page, author_page_url)
+
+        page_content = await page.locator('body').inner_text()
+        match = re.search(EMAIL_PATTERN, page_content)
+        email = match.group(0) if match else None
+        if author_page_url and self.cache:
+            self.cache.put(author_page_url, email)
+        return email
+
+    # --- Reporting ---
+    def stats(self):
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            'pages': self.page_loads,
+            'seconds': round(elapsed, 2),
+            'pages_per_sec': round(self.page_loads / elapsed, 2) if elapsed else 0.0,
+            'recycled': self.recycled,
+        }
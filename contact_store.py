@@ -0,0 +1,634 @@
+#!/usr/bin/env python3
+import csv
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+
+# Get the absolute path of the directory where this script is located
+# so cron jobs open the same database no matter where they start.
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# --- CONFIGURATION ---
+STORE_FILE = os.getenv('JOURNALIST_DB', os.path.join(SCRIPT_DIR, 'journalists.db'))
+# Legacy flat files, imported once and written by `contact_store.py export`.
+MASTER_LIST_FILE = os.path.join(SCRIPT_DIR, 'master_journalist_list.csv')
+PENDING_FILE = os.path.join(SCRIPT_DIR, 'pending_verification.csv')
+BLACKLIST_FILE = os.path.join(SCRIPT_DIR, 'blacklist_emails.txt')
+SEEN_ARTICLES_FILE = os.path.join(SCRIPT_DIR, 'seen_articles.txt')
+COLUMNS = ['first_name', 'last_name', 'email', 'city', 'state', 'country', 'phone',
+           'publications', 'title', 'topics', 'twitter', 'source_url']
+CSV_HEADER = ['First_Name', 'Last_Name', 'Email', 'City', 'State', 'Country', 'phone',
+              'publications', 'title', 'topics', 'twitter', 'source_url']
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS contacts (
+    id INTEGER PRIMARY KEY,
+    {', '.join(f'{c} TEXT NOT NULL DEFAULT ""' for c in COLUMNS)},
+    name_key TEXT NOT NULL,
+    added_at REAL NOT NULL,
+    UNIQUE (email COLLATE NOCASE)
+);
+CREATE INDEX IF NOT EXISTS contacts_name_key ON contacts (name_key);
+
+CREATE TABLE IF NOT EXISTS pending (
+    id INTEGER PRIMARY KEY,
+    {', '.join(f'{c} TEXT NOT NULL DEFAULT ""' for c in COLUMNS)},
+    name_key TEXT NOT NULL,
+    added_at REAL NOT NULL,
+    UNIQUE (email COLLATE NOCASE)
+);
+CREATE INDEX IF NOT EXISTS pending_name_key ON pending (name_key);
+
+CREATE TABLE IF NOT EXISTS blacklist (
+    email TEXT PRIMARY KEY COLLATE NOCASE,
+    added_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS seen_articles (
+    key TEXT PRIMARY KEY,
+    seen_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS domain_cache (
+    domain TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    mail_hosts TEXT NOT NULL DEFAULT "",
+    checked_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS author_pages (
+    url_key TEXT PRIMARY KEY,
+    email TEXT,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS author_pages_used ON author_pages (used_at);
+
+CREATE TABLE IF NOT EXISTS sheets_outbox (
+    id INTEGER PRIMARY KEY,
+    worksheet TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    added_at REAL NOT NULL,
+    UNIQUE (worksheet, row_key)
+);
+
+CREATE TABLE IF NOT EXISTS sheets_keys (
+    worksheet TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    PRIMARY KEY (worksheet, row_key)
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS lookup_queue (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    outlet TEXT NOT NULL,
+    article_url TEXT NOT NULL,
+    record TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    added_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (name_key)
+);
+CREATE INDEX IF NOT EXISTS lookup_queue_state ON lookup_queue (state, id);
+
+CREATE TABLE IF NOT EXISTS staff_directory (
+    outlet TEXT NOT NULL,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    email TEXT NOT NULL,
+    harvested_at REAL NOT NULL,
+    UNIQUE (outlet, name_key)
+);
+"""
+
+def name_key(first_name, last_name):
+    return f"{first_name} {last_name}".strip().lower()
+
+def _pad(row):
+    """CSV rows come with 11 or 12 columns; the store always keeps 12."""
+    row = [str(value) if value is not None else '' for value in row[:len(COLUMNS)]]
+    return row + [''] * (len(COLUMNS) - len(row))
+
+class ContactStore:
+    """
+    One SQLite file holding the verified contacts, the pending queue, the
+    blacklist and the seen-article index. Every write happens in a single
+    transaction, so a crash can never leave the queue half-written.
+    """
+    def __init__(self, filename=STORE_FILE, threaded=False):
+        self.filename = filename
+        # `threaded` lets one connection be shared between threads; the caller must serialise access.
+        self.conn = sqlite3.connect(filename, timeout=30, isolation_level=None, check_same_thread=not threaded)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self._add_column('pending', 'status', "TEXT NOT NULL DEFAULT 'queued'")
+
+    def _add_column(self, table, column, definition):
+        """Brings databases created by older versions up to the current schema."""
+        columns = [row[1] for row in self.conn.execute(f'PRAGMA table_info({table})')]
+        if column not in columns:
+            self.conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        self.conn.execute('COMMIT')
+
+    # --- Contacts & pending queue ---
+    def journalist_names(self, added_since=0):
+        """Full names of everyone in the contacts table, the pending queue or the lookup queue."""
+        cursor = self.conn.execute("SELECT first_name || ' ' || last_name FROM contacts WHERE added_at >= ? "
+                                   "UNION SELECT first_name || ' ' || last_name FROM pending WHERE added_at >= ? "
+                                   "UNION SELECT name FROM lookup_queue WHERE added_at >= ?", (added_since,) * 3)
+        return [row[0].strip() for row in cursor]
+
+    def _insert(self, table, rows):
+        rows = [_pad(row) for row in rows]
+        now = time.time()
+        cursor = self.conn.executemany(
+            f"INSERT OR IGNORE INTO {table} ({', '.join(COLUMNS)}, name_key, added_at) "
+            f"VALUES ({', '.join('?' * len(COLUMNS))}, ?, ?)",
+            [row + [name_key(row[0], row[1]), now] for row in rows])
+        return cursor.rowcount
+
+    def add_contacts(self, rows):
+        """Adds verified rows. Returns how many were new."""
+        with self.transaction():
+            return self._insert('contacts', rows)
+
+    def add_pending(self, rows):
+        """Queues guessed rows for validation. Returns how many were new."""
+        with self.transaction():
+            return self._insert('pending', rows)
+
+    def count(self, table):
+        return self.conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+    def pending_counts(self):
+        """Number of pending guesses per status (queued / catch_all ...)."""
+        return dict(self.conn.execute('SELECT status, COUNT(*) FROM pending GROUP BY status'))
+
+    def contact_rows(self):
+        return [list(row) for row in self.conn.execute(f"SELECT {', '.join(COLUMNS)} FROM contacts ORDER BY id")]
+
+    def contacts_after(self, after_id=0):
+        """(id, row) for contacts added after `after_id`. Contacts are never deleted, so ids only grow."""
+        cursor = self.conn.execute(f"SELECT id, {', '.join(COLUMNS)} FROM contacts WHERE id > ? ORDER BY id",
+                                   (after_id,))
+        return [(row[0], list(row[1:])) for row in cursor]
+
+    def pending_rows(self, limit=500, after_id=0, status='queued'):
+        """Returns up to `limit` (pending_id, row) pairs, oldest first, starting after `after_id`."""
+        cursor = self.conn.execute(
+            f"SELECT id, {', '.join(COLUMNS)} FROM pending WHERE id > ? AND status = ? ORDER BY id LIMIT ?",
+            (after_id, status, limit))
+        return [(row[0], list(row[1:])) for row in cursor]
+
+    def set_pending_status(self, pending_ids, status):
+        """Parks rows (e.g. on catch-all domains) so they stop costing verifier credits."""
+        with self.transaction() as conn:
+            conn.executemany('UPDATE pending SET status = ? WHERE id = ?', [(status, i) for i in pending_ids])
+
+    def requeue_parked(self, status):
+        """
+        Puts rows parked under a domain status (e.g. catch_all) back in the
+        queue once their domain's cache entry has expired or says otherwise.
+        Returns the number of rows re-queued.
+        """
+        with self.transaction() as conn:
+            return conn.execute(
+                "UPDATE pending SET status = 'queued' WHERE status = ? AND NOT EXISTS ("
+                "SELECT 1 FROM domain_cache WHERE domain = lower(substr(pending.email, instr(pending.email, '@') + 1)) "
+                "AND status = ? AND expires_at > ?)", (status, status, time.time())).rowcount
+
+    def resolve_pending(self, valid_ids=(), invalid_ids=(), outbox=None, parked=None):
+        """
+        Moves validated rows into contacts and blacklists the rest, all in
+        one transaction. `outbox` ({worksheet: rows}) queues the valid rows
+        for Sheets and `parked` ({status: ids}) parks rows (see
+        set_pending_status) in that same transaction, so a crash can't
+        leave a contact that never reaches the sheet.
+        """
+        valid_ids, invalid_ids = list(valid_ids), list(invalid_ids)
+        now = time.time()
+        with self.transaction() as conn:
+            for worksheet, rows in (outbox or {}).items():
+                self._insert_outbox(worksheet, rows)
+            for status, pending_ids in (parked or {}).items():
+                conn.executemany('UPDATE pending SET status = ? WHERE id = ?', [(status, i) for i in pending_ids])
+            for pending_id in valid_ids:
+                conn.execute(
+                    f"INSERT OR IGNORE INTO contacts ({', '.join(COLUMNS)}, name_key, added_at) "
+                    f"SELECT {', '.join(COLUMNS)}, name_key, ? FROM pending WHERE id = ?", (now, pending_id))
+            for pending_id in invalid_ids:
+                conn.execute('INSERT OR IGNORE INTO blacklist (email, added_at) '
+                             'SELECT email, ? FROM pending WHERE id = ?', (now, pending_id))
+            conn.executemany('DELETE FROM pending WHERE id = ?', [(i,) for i in valid_ids + invalid_ids])
+
+    # --- Blacklist ---
+    def is_blacklisted(self, email):
+        return self.conn.execute('SELECT 1 FROM blacklist WHERE email = ?', (email.strip(),)).fetchone() is not None
+
+    def add_blacklist(self, emails):
+        now = time.time()
+        with self.transaction() as conn:
+            conn.executemany('INSERT OR IGNORE INTO blacklist (email, added_at) VALUES (?, ?)',
+                             [(e.strip().lower(), now) for e in emails if e.strip()])
+
+    def blacklist_emails(self):
+        return [row[0] for row in self.conn.execute('SELECT email FROM blacklist')]
+
+    def blacklist_after(self, after_id=0):
+        """(rowid, email) for entries added after `after_id`; like contacts, the blacklist only grows."""
+        return self.conn.execute('SELECT rowid, email FROM blacklist WHERE rowid > ? ORDER BY rowid',
+                                 (after_id,)).fetchall()
+
+    # --- Seen articles ---
+    def seen_article(self, keys):
+        keys = list(keys)
+        if not keys:
+            return False
+        return self.conn.execute(
+            f"SELECT 1 FROM seen_articles WHERE key IN ({', '.join('?' * len(keys))}) LIMIT 1", keys).fetchone() is not None
+
+    def add_seen_articles(self, keys):
+        now = time.time()
+        with self.transaction() as conn:
+            conn.executemany('INSERT OR IGNORE INTO seen_articles (key, seen_at) VALUES (?, ?)', [(k, now) for k in keys])
+
+    # --- Domain cache ---
+    def get_domain(self, domain):
+        row = self.conn.execute('SELECT status, mail_hosts, checked_at, expires_at FROM domain_cache WHERE domain = ?',
+                                (domain,)).fetchone()
+        if not row:
+            return None
+        return {'status': row[0], 'mail_hosts': row[1].split(',') if row[1] else [],
+                'checked_at': row[2], 'expires_at': row[3]}
+
+    def put_domain(self, domain, status, mail_hosts, ttl):
+        now = time.time()
+        self.conn.execute('INSERT OR REPLACE INTO domain_cache (domain, status, mail_hosts, checked_at, expires_at) '
+                          'VALUES (?, ?, ?, ?, ?)', (domain, status, ','.join(mail_hosts), now, now + ttl))
+
+    # --- Author-page cache ---
+    def get_author_page(self, url_key):
+        """(found, email) for a cached author page; email is None when the page had none."""
+        now = time.time()
+        row = self.conn.execute('SELECT email FROM author_pages WHERE url_key = ? AND expires_at > ?',
+                                (url_key, now)).fetchone()
+        if not row:
+            return False, None
+        self.conn.execute('UPDATE author_pages SET used_at = ? WHERE url_key = ?', (now, url_key))
+        return True, row[0]
+
+    def put_author_page(self, url_key, email, ttl):
+        now = time.time()
+        self.conn.execute('INSERT OR REPLACE INTO author_pages (url_key, email, fetched_at, expires_at, used_at) '
+                          'VALUES (?, ?, ?, ?, ?)', (url_key, email, now, now + ttl, now))
+
+    def evict_author_pages(self, max_entries):
+        """Drops expired pages, then the least recently used ones beyond `max_entries`. Returns rows removed."""
+        with self.transaction() as conn:
+            removed = conn.execute('DELETE FROM author_pages WHERE expires_at <= ?', (time.time(),)).rowcount
+            removed += conn.execute('DELETE FROM author_pages WHERE url_key IN (SELECT url_key FROM author_pages '
+                                    'ORDER BY used_at DESC LIMIT -1 OFFSET ?)', (max_entries,)).rowcount
+        return removed
+
+    # --- Google Sheets outbox ---
+    def enqueue_outbox(self, worksheet, rows):
+        """Queues rows for upload, keyed by lowercase email. Returns how many were new."""
+        with self.transaction():
+            return self._insert_outbox(worksheet, rows)
+
+    def _insert_outbox(self, worksheet, rows):
+        cursor = self.conn.executemany(
+            'INSERT OR IGNORE INTO sheets_outbox (worksheet, row_key, payload, added_at) VALUES (?, ?, ?, ?)',
+            [(worksheet, row[2].strip().lower(), json.dumps(list(row)), time.time()) for row in rows if len(row) > 2])
+        return cursor.rowcount
+
+    def outbox_count(self, worksheet):
+        return self.conn.execute('SELECT COUNT(*) FROM sheets_outbox WHERE worksheet = ?', (worksheet,)).fetchone()[0]
+
+    def outbox_batch(self, worksheet, limit):
+        """Returns up to `limit` (outbox_id, row_key, row, status) tuples, oldest first."""
+        cursor = self.conn.execute('SELECT id, row_key, payload, status FROM sheets_outbox WHERE worksheet = ? '
+                                   'ORDER BY id LIMIT ?', (worksheet, limit))
+        return [(row[0], row[1], json.loads(row[2]), row[3]) for row in cursor]
+
+    def outbox_in_flight(self, worksheet):
+        """True if a previous upload was interrupted and may or may not have landed."""
+        return self.conn.execute("SELECT 1 FROM sheets_outbox WHERE worksheet = ? AND status = 'sending' LIMIT 1",
+                                 (worksheet,)).fetchone() is not None
+
+    def mark_outbox_sending(self, outbox_ids):
+        with self.transaction() as conn:
+            conn.executemany("UPDATE sheets_outbox SET status = 'sending', attempts = attempts + 1 WHERE id = ?",
+                             [(i,) for i in outbox_ids])
+
+    def fail_outbox(self, outbox_ids, error):
+        with self.transaction() as conn:
+            conn.executemany("UPDATE sheets_outbox SET status = 'queued', last_error = ? WHERE id = ?",
+                             [(error, i) for i in outbox_ids])
+
+    def complete_outbox(self, worksheet, outbox_ids, row_keys):
+        """Records that the rows are in the sheet and removes them from the outbox, atomically."""
+        with self.transaction() as conn:
+            conn.executemany('INSERT OR IGNORE INTO sheets_keys (worksheet, row_key) VALUES (?, ?)',
+                             [(worksheet, key) for key in row_keys])
+            conn.executemany('DELETE FROM sheets_outbox WHERE id = ?', [(i,) for i in outbox_ids])
+
+    def sheet_keys(self, worksheet, row_keys):
+        """Returns which of `row_keys` are already known to be in the sheet."""
+        row_keys = list(row_keys)
+        if not row_keys:
+            return set()
+        cursor = self.conn.execute(
+            f"SELECT row_key FROM sheets_keys WHERE worksheet = ? AND row_key IN ({', '.join('?' * len(row_keys))})",
+            [worksheet] + row_keys)
+        return {row[0] for row in cursor}
+
+    def replace_sheet_keys(self, worksheet, row_keys):
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM sheets_keys WHERE worksheet = ?', (worksheet,))
+            conn.executemany('INSERT OR IGNORE INTO sheets_keys (worksheet, row_key) VALUES (?, ?)',
+                             [(worksheet, key) for key in row_keys])
+            conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                         (f'sheets_keys_refreshed:{worksheet}', str(time.time())))
+
+    # --- Email lookup queue ---
+    def enqueue_lookups(self, jobs):
+        """
+        Queues email searches: dicts with name, outlet, article_url and record
+        (the contact row, holding the best guess in the email column).
+        Someone already queued is skipped. Returns how many were new.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            cursor = conn.executemany(
+                'INSERT OR IGNORE INTO lookup_queue (name, name_key, outlet, article_url, record, added_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(job['name'], name_key(job['record'][0], job['record'][1]), json.dumps(job['outlet']),
+                  job['article_url'], json.dumps(job['record']), now, now) for job in jobs])
+            return cursor.rowcount
+
+    def claim_lookups(self, owner, limit, lease_seconds, max_attempts):
+        """
+        Leases up to `limit` queued searches to `owner`, taking turns between
+        outlets. Searches whose lease ran out (the worker crashed or hung) are
+        queued again, or given up on once tried `max_attempts` times (see fail_lookup).
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            expired = [row[0] for row in conn.execute(
+                "SELECT id FROM lookup_queue WHERE state = 'in_progress' AND lease_expires < ?", (now,))]
+            self._retry_or_fail(expired, 'lease expired', max_attempts)
+            # Round-robin across outlets (each outlet's oldest first), so the searches in flight
+            # hit different sites instead of queueing behind one site's rate limit.
+            rows = conn.execute("SELECT id, name, outlet, article_url, record FROM lookup_queue "
+                                "WHERE state = 'queued' ORDER BY ROW_NUMBER() OVER "
+                                "(PARTITION BY json_extract(outlet, '$.outlet') ORDER BY id), id LIMIT ?",
+                                (limit,)).fetchall()
+            conn.executemany("UPDATE lookup_queue SET state = 'in_progress', attempts = attempts + 1, lease_owner = ?, "
+                             "lease_expires = ?, updated_at = ? WHERE id = ?",
+                             [(owner, now + lease_seconds, now, row[0]) for row in rows])
+        return [{'id': row[0], 'name': row[1], 'outlet': json.loads(row[2]), 'article_url': row[3],
+                 'record': json.loads(row[4])} for row in rows]
+
+    def complete_lookup(self, job, email, worksheet):
+        """
+        Checkpoints one finished search: a found email goes into contacts and
+        the Sheets outbox, otherwise the guess joins the pending queue.
+        """
+        record = list(job['record'])
+        with self.transaction() as conn:
+            if email:
+                record[2] = email
+                self._insert('contacts', [record])
+                self._insert_outbox(worksheet, [record])
+            else:
+                self._insert('pending', [record])
+            conn.execute("UPDATE lookup_queue SET state = 'done', lease_owner = NULL, updated_at = ? WHERE id = ?",
+                         (time.time(), job['id']))
+        return record
+
+    def fail_lookup(self, job_id, error, max_attempts):
+        """
+        Puts a search back in the queue, or marks it failed after
+        `max_attempts` tries. A failed search's guess still joins the pending
+        queue, so the lead isn't lost. Returns True if it was given up on.
+        """
+        with self.transaction():
+            return bool(self._retry_or_fail([job_id], error, max_attempts))
+
+    def _retry_or_fail(self, job_ids, error, max_attempts):
+        """Inside a transaction: requeues searches, failing (and queueing the guess of) any out of attempts."""
+        failed = []
+        for job_id in job_ids:
+            row = self.conn.execute('SELECT attempts, record FROM lookup_queue WHERE id = ?', (job_id,)).fetchone()
+            if row and row[0] >= max_attempts:
+                failed.append(json.loads(row[1]))
+        self._insert('pending', failed)
+        self.conn.executemany("UPDATE lookup_queue SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                              "last_error = ?, lease_owner = NULL, updated_at = ? WHERE id = ?",
+                              [(max_attempts, error, time.time(), job_id) for job_id in job_ids])
+        return failed
+
+    def lookup_counts(self):
+        """Number of searches per state (queued / in_progress / done / failed)."""
+        return dict(self.conn.execute('SELECT state, COUNT(*) FROM lookup_queue GROUP BY state'))
+
+    def prune_lookups(self, older_than):
+        """Forgets finished searches; their results are already in contacts / pending."""
+        with self.transaction() as conn:
+            return conn.execute("DELETE FROM lookup_queue WHERE state = 'done' AND updated_at < ?",
+                                (time.time() - older_than,)).rowcount
+
+    # --- Staff directories ---
+    def replace_staff(self, outlet, staff):
+        """Swaps in a fresh harvest ({name: email}) of one outlet's staff pages."""
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM staff_directory WHERE outlet = ?', (outlet,))
+            conn.executemany('INSERT OR IGNORE INTO staff_directory (outlet, name, name_key, email, harvested_at) '
+                             'VALUES (?, ?, ?, ?, ?)',
+                             [(outlet, name, name.strip().lower(), email, now) for name, email in staff.items()])
+
+    def staff_rows(self):
+        """(outlet, name, email) for every harvested staff member."""
+        return self.conn.execute('SELECT outlet, name, email FROM staff_directory ORDER BY outlet, name').fetchall()
+
+    # --- Meta ---
+    def get_meta(self, key, default=None):
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        self.conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    # --- Merging ---
+    def merge_from(self, filename):
+        """
+        Copies another store's rows in (e.g. from a shard run on another
+        host). Rows already here, by email or key, are skipped; a pending
+        guess is dropped if it is already a contact or blacklisted.
+        Returns the number of new rows per table.
+        """
+        columns = ', '.join(COLUMNS)
+        statements = [
+            ('blacklist', 'INSERT OR IGNORE INTO blacklist SELECT email, added_at FROM other.blacklist'),
+            ('contacts', f'INSERT OR IGNORE INTO contacts ({columns}, name_key, added_at) '
+                         f'SELECT {columns}, name_key, added_at FROM other.contacts'),
+            ('pending', f'INSERT OR IGNORE INTO pending ({columns}, name_key, added_at, status) '
+                        f'SELECT {columns}, name_key, added_at, status FROM other.pending '
+                        f'WHERE lower(email) NOT IN (SELECT lower(email) FROM contacts UNION SELECT lower(email) FROM blacklist)'),
+            ('seen_articles', 'INSERT OR IGNORE INTO seen_articles SELECT key, seen_at FROM other.seen_articles'),
+            ('sheets_outbox', 'INSERT OR IGNORE INTO sheets_outbox (worksheet, row_key, payload, added_at) '
+                              'SELECT worksheet, row_key, payload, added_at FROM other.sheets_outbox'),
+        ]
+        self.conn.execute('ATTACH DATABASE ? AS other', (filename,))
+        try:
+            counts = {}
+            with self.transaction() as conn:
+                for table, sql in statements:
+                    counts[table] = conn.execute(sql).rowcount
+            return counts
+        finally:
+            self.conn.execute('DETACH DATABASE other')
+
+    # --- CSV compatibility ---
+    def import_csvs(self, master_file=MASTER_LIST_FILE, pending_file=PENDING_FILE,
+                    blacklist_file=BLACKLIST_FILE, seen_file=SEEN_ARTICLES_FILE, force=False):
+        """
+        One-shot import of the legacy flat files. Does nothing once it has
+        run, unless `force` is set. Returns the number of rows read per file.
+        Only counts as done once at least one of the files was found.
+        """
+        if self.get_meta('csv_imported') and not force:
+            return None
+        files = (master_file, pending_file, blacklist_file, seen_file)
+        if not any(os.path.exists(filename) for filename in files):
+            return None
+        counts = {}
+        with self.transaction():
+            for filename, table in ((master_file, 'contacts'), (pending_file, 'pending')):
+                rows = _read_csv(filename)
+                counts[filename] = len(rows)
+                self._insert(table, rows)
+            now = time.time()
+            blacklist = _read_lines(blacklist_file, lower=True)
+            counts[blacklist_file] = len(blacklist)
+            self.conn.executemany('INSERT OR IGNORE INTO blacklist (email, added_at) VALUES (?, ?)',
+                                  [(email, now) for email in blacklist])
+            seen = _read_lines(seen_file)
+            counts[seen_file] = len(seen)
+            self.conn.executemany('INSERT OR IGNORE INTO seen_articles (key, seen_at) VALUES (?, ?)',
+                                  [(key, now) for key in seen])
+            self.set_meta('csv_imported', str(time.time()))
+        return counts
+
+    def export_csv(self, table, filename):
+        """Writes a table back out in the legacy CSV layout."""
+        tmp = f"{filename}.tmp"
+        with open(tmp, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            writer.writerows(self.conn.execute(f"SELECT {', '.join(COLUMNS)} FROM {table} ORDER BY id"))
+        os.replace(tmp, filename)
+
+    def export_blacklist(self, filename):
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.writelines(f"{email}\n" for email in sorted(self.blacklist_emails()))
+
+    def export_to_sheet(self, worksheet, rows=None):
+        """Replaces a worksheet's contents with the given contact rows (default: every verified contact)."""
+        worksheet.clear()
+        worksheet.update([CSV_HEADER] + (self.contact_rows() if rows is None else rows),
+                         value_input_option='USER_ENTERED')
+
+def _read_csv(filename):
+    try:
+        with open(filename, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            return [row for row in reader if len(row) > 2 and row[2].strip()]
+    except FileNotFoundError:
+        return []
+
+def _read_lines(filename, lower=False):
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            lines = [line.strip() for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+    return [line.lower() for line in lines] if lower else lines
+
+def main(argv):
+    """
+    python3 contact_store.py import         # (re)import the legacy CSV / txt files
+    python3 contact_store.py export         # write the CSV / txt files from the store
+    python3 contact_store.py export-sheets  # replace each region's tab with its contacts (outlets.json)
+    python3 contact_store.py merge OTHER.db # copy in another store's rows (e.g. a shard's), skipping duplicates
+    """
+    command = argv[1] if len(argv) > 1 else ''
+    store = ContactStore()
+    if command == 'import':
+        counts = store.import_csvs(force=True)
+        if counts is None:
+            print(f"Nothing to import: none of the legacy files are in {SCRIPT_DIR}.")
+        for filename, count in (counts or {}).items():
+            print(f"Imported {count} rows from {filename}")
+    elif command == 'export':
+        store.export_csv('contacts', MASTER_LIST_FILE)
+        store.export_csv('pending', PENDING_FILE)
+        store.export_blacklist(BLACKLIST_FILE)
+        print(f"Exported {store.count('contacts')} contacts, {store.count('pending')} pending, "
+              f"{store.count('blacklist')} blacklisted emails.")
+    elif command == 'export-sheets':
+        import outlet_registry
+        import sheets_client
+        registry = outlet_registry.OutletRegistry()
+        grouped = registry.group_by_worksheet(store.contact_rows())
+        client = sheets_client.GoogleSheetsClient()
+        for worksheet_name in registry.worksheets():
+            worksheet = client.get_worksheet(worksheet_name)
+            if worksheet:
+                rows = grouped.get(worksheet_name, [])
+                store.export_to_sheet(worksheet, rows)
+                print(f"Exported {len(rows)} contacts to '{worksheet_name}'.")
+    elif command == 'merge' and len(argv) > 2:
+        counts = store.merge_from(argv[2])
+        print("Merged " + ', '.join(f"{count} {table}" for table, count in counts.items()) + f" from {argv[2]}.")
+    else:
+        print(main.__doc__)
+    store.close()
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+import requests
+import metrics
+from rate_limit import TokenBucket
+
+# --- CONFIGURATION ---
+# Requests per second to any one site (per process). Different sites are paced independently.
+RATE_PER_HOST = float(os.getenv('CRAWL_RATE_PER_HOST', 1.0))
+BURST_PER_HOST = 2
+ROBOTS_TTL = 24 * 3600          # How long a site's robots.txt is trusted.
+ROBOTS_ERROR_TTL = 3600         # An unreachable robots.txt is tried again sooner.
+ROBOTS_TIMEOUT = 10
+# Crawl-delay is honoured up to this many seconds, so one site can't hold a lookup past its lease.
+MAX_CRAWL_DELAY = 30
+
+def host_of(url):
+    return urlsplit(url).netloc.lower()
+
+class _Host:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bucket = None
+        self.robots = None
+        self.robots_expires = 0.0
+
+class CrawlScheduler:
+    """
+    Paces article, author-page and staff-directory visits per site.
+
+    Each host gets its own token bucket, so a lookup only waits for the
+    site it is about to hit; lookups against other sites carry on in
+    parallel, and total throughput grows with the number of outlets.
+    robots.txt is fetched once per host and cached: disallowed pages are
+    skipped, and a Crawl-delay slows that host's bucket down.
+    """
+    def __init__(self, session, rate_per_host=RATE_PER_HOST, burst=BURST_PER_HOST, log=print):
+        self.session = session
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.log = log
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url):
+        with self._lock:
+            return self._hosts.setdefault(host_of(url), _Host())
+
+    def _load_robots(self, url, host):
+        parts = urlsplit(url)
+        robots_url = f"{parts.scheme}://{parts.netloc}/robots.txt"
+        robots = RobotFileParser(robots_url)
+        robots.modified()    # crawl_delay() ignores a parser that was never marked as read.
+        ttl = ROBOTS_TTL
+        try:
+            response = self.session.get(robots_url, timeout=ROBOTS_TIMEOUT)
+            if response.status_code in (401, 403):
+                robots.disallow_all = True
+            elif response.status_code >= 400:
+                robots.allow_all = True
+            else:
+                robots.parse(response.text.splitlines())
+        except requests.exceptions.RequestException as e:
+            self.log(f"  -> [robots] Could not fetch {robots_url}: {e}")
+            robots.allow_all = True
+            ttl = ROBOTS_ERROR_TTL
+        delay = robots.crawl_delay(self._user_agent()) if not (robots.allow_all or robots.disallow_all) else None
+        rate = self.rate_per_host
+        if delay:
+            rate = min(rate, 1.0 / min(float(delay), MAX_CRAWL_DELAY))
+        if host.bucket is None or host.bucket.rate != rate:
+            host.bucket = TokenBucket(rate, capacity=self.burst if rate == self.rate_per_host else 1)
+        host.robots = robots
+        host.robots_expires = time.time() + ttl
+
+    def _user_agent(self):
+        return self.session.headers.get('User-Agent', '*')
+
+    def _ready(self, url):
+        host = self._host(url)
+        with host.lock:
+            if host.robots is None or time.time() >= host.robots_expires:
+                self._load_robots(url, host)
+        return host
+
+    def allowed(self, url):
+        """False when the site's robots.txt asks crawlers to stay away from this page."""
+        host = self._ready(url)
+        if host.robots.can_fetch(self._user_agent(), url):
+            return True
+        metrics.count('robots_disallowed', host=host_of(url))
+        return False
+
+    def acquire(self, url):
+        """Blocks until the page's site may be hit again."""
+        bucket = self._ready(url).bucket
+        if bucket.try_acquire():
+            return
+        with metrics.timer('crawl_wait', host=host_of(url)):
+            bucket.acquire()
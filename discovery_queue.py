@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+import argparse
+import multiprocessing
+import os
+import socket
+import sys
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+import metrics
+
+# --- CONFIGURATION ---
+LEASE_SECONDS = int(os.getenv('LOOKUP_LEASE_SECONDS', 600))   # Longer than the slowest browser lookup.
+MAX_ATTEMPTS = 3
+DONE_RETENTION = 7 * 24 * 3600                                # How long finished searches stay in the queue.
+
+def log(message):
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    print(f"[{timestamp}] {message}")
+
+class LookupWorker:
+    """
+    Drains the contact store's lookup queue. Searches are leased a few at a
+    time, so several workers (threads here, processes or hosts elsewhere) can
+    share one queue, and each result is written to the store the moment it
+    arrives. A crash loses at most the searches in flight, which are handed
+    out again once their lease runs out.
+    """
+    def __init__(self, store, finder, pool, concurrency, owner=None, lease_seconds=LEASE_SECONDS,
+                 max_attempts=MAX_ATTEMPTS, log=log):
+        self.store = store
+        self.finder = finder
+        self.pool = pool
+        self.concurrency = max(1, concurrency)
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.log = log
+        self.found = self.queued = self.failed = 0
+
+    def drain(self, stop=None):
+        """Works until the queue is empty (or `stop` is set). Returns the number of searches finished."""
+        in_flight = {}
+        finished = 0
+        while True:
+            free = self.concurrency - len(in_flight)
+            if free and not (stop and stop.is_set()):
+                for job in self.store.claim_lookups(self.owner, free, self.lease_seconds, self.max_attempts):
+                    future = self.pool.submit(self.finder.find_email, job['outlet'], job['article_url'], job['name'])
+                    in_flight[future] = job
+            if not in_flight:
+                return finished
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                self._finish(in_flight.pop(future), future)
+                finished += 1
+
+    def _finish(self, job, future):
+        name, outlet = job['name'], job['outlet']
+        try:
+            email, tier = future.result()
+        except Exception as e:
+            self.failed += 1
+            metrics.count('lookup_failures', outlet=outlet['outlet'])
+            if self.store.fail_lookup(job['id'], f"{type(e).__name__}: {e}", self.max_attempts):
+                self.queued += 1
+                metrics.count('guesses_queued', outlet=outlet['outlet'])
+                self.log(f"  -> Search for {name} failed: {type(e).__name__}: {e}. Giving up; "
+                         f"queueing guess {job['record'][2]} for API validation.")
+            else:
+                self.log(f"  -> Search for {name} failed: {type(e).__name__}: {e}. Will retry.")
+            return
+        record = self.store.complete_lookup(job, email, outlet.get('worksheet', 'master_list'))
+        if email:
+            self.found += 1
+            metrics.count('emails_found', outlet=outlet['outlet'], tier=tier)
+            self.log(f"  -> SUCCESS! Found real email for {name} ({tier}): {email}")
+        else:
+            self.queued += 1
+            metrics.count('guesses_queued', outlet=outlet['outlet'])
+            self.log(f"  -> No public email found for {name}. Queueing guess {record[2]} for API validation.")
+
+def describe_counts(counts):
+    return ', '.join(f"{counts.get(state, 0)} {state}" for state in ('queued', 'in_progress', 'done', 'failed'))
+
+def run_worker(index, workers=1):
+    """One worker process: its own store connection, HTTP session and browser pool."""
+    import author_cache
+    import contact_store
+    import crawl_scheduler
+    import email_finder
+    import feed_fetcher
+    import monitor
+    import staff_directory
+    store = contact_store.ContactStore()
+    session = feed_fetcher.create_session(monitor.HEADERS, pool_size=monitor.FEED_PER_HOST_LIMIT)
+    # Harvesting is the monitor's job; workers only read what it has stored.
+    directory = staff_directory.StaffDirectory(store, session, log=log)
+    # Each process paces itself, so the per-site rate is split between the workers.
+    scheduler = crawl_scheduler.CrawlScheduler(session, rate_per_host=crawl_scheduler.RATE_PER_HOST / workers, log=log)
+    author_pages = author_cache.AuthorPageCache(store.filename)
+    finder = email_finder.EmailFinder(session, browser_pool_size=monitor.BROWSER_POOL_SIZE, log=log,
+                                      directory=directory, scheduler=scheduler, cache=author_pages)
+    try:
+        with ThreadPoolExecutor(max_workers=monitor.EMAIL_LOOKUP_CONCURRENCY) as pool:
+            worker = LookupWorker(store, finder, pool, monitor.EMAIL_LOOKUP_CONCURRENCY, log=log)
+            worker.drain()
+        finder.report()
+        log(f"Worker {index}: {worker.found} emails found, {worker.queued} guesses queued, "
+            f"{worker.failed} failures.")
+    finally:
+        finder.close()
+        author_pages.close()
+        store.close()
+    return worker.failed == 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Work through the queued email searches.")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes to run in parallel")
+    parser.add_argument('--status', action='store_true', help="only print how many searches are in each state")
+    args = parser.parse_args(argv)
+
+    import contact_store
+    store = contact_store.ContactStore()
+    log(f"Lookup queue: {describe_counts(store.lookup_counts())}.")
+    if args.status:
+        store.close()
+        return 0
+    pruned = store.prune_lookups(DONE_RETENTION)
+    if pruned:
+        log(f"Pruned {pruned} finished searches.")
+
+    if args.workers > 1:
+        # Spawned, not forked: each process starts its own threads and browser.
+        with multiprocessing.get_context('spawn').Pool(args.workers) as processes:
+            ok = all(processes.starmap(run_worker, [(i, args.workers) for i in range(1, args.workers + 1)]))
+    else:
+        ok = run_worker(1)
+
+    import outlet_registry
+    import sheets_outbox
+    syncer = sheets_outbox.SheetsSync(store, log=log)
+    for worksheet in outlet_registry.OutletRegistry().worksheets():
+        syncer.sync(worksheet)
+    log(f"Lookup queue: {describe_counts(store.lookup_counts())}.")
+    store.close()
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
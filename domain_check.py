@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+import os
+import re
+import time
+import dns.exception
+import dns.resolver
+
+# --- CONFIGURATION ---
+DOMAIN_TTL = 7 * 24 * 3600        # How long a good / dead domain verdict is trusted.
+CATCH_ALL_TTL = 30 * 24 * 3600    # Catch-all setups rarely change.
+DNS_ERROR_TTL = 3600              # Temporary DNS failures are retried sooner.
+DNS_TIMEOUT = 5
+# e.g. "127.0.0.1:5353" to point at a local stub server, or "1.1.1.1,8.8.8.8"
+DNS_NAMESERVERS = os.getenv('DNS_NAMESERVERS', '')
+EMAIL_SYNTAX = re.compile(r"^[A-Za-z0-9.!#$%&'*+/=?^_`{|}~-]{1,64}@(?=.{1,253}$)([A-Za-z0-9-]{1,63}\.)+[A-Za-z]{2,63}$")
+
+# Domain statuses
+OK = 'ok'
+NO_MAIL = 'no_mail'        # NXDOMAIN, null MX, or no MX and no A record
+CATCH_ALL = 'catch_all'    # Accepts every address, so the verifier can't tell us anything
+DNS_ERROR = 'dns_error'
+BAD_SYNTAX = 'bad_syntax'
+
+def valid_syntax(email):
+    return bool(email) and '..' not in email and EMAIL_SYNTAX.match(email) is not None
+
+class DnsResolver:
+    """
+    Looks up where a domain's mail goes. Anything with the same
+    mail_status(domain) method can be swapped in (e.g. for a stub server).
+    """
+    def __init__(self, nameservers=DNS_NAMESERVERS, timeout=DNS_TIMEOUT):
+        if isinstance(nameservers, str):
+            nameservers = nameservers.split(',')
+        servers = []
+        for server in nameservers or []:
+            server = server.strip()
+            if not server:
+                continue
+            host, port = server.split(':') if server.count(':') == 1 else (server, 53)
+            servers.append((host, int(port)))
+        self.resolver = dns.resolver.Resolver(configure=not servers)
+        if servers:
+            self.resolver.nameservers = [host for host, _ in servers]
+            self.resolver.nameserver_ports = dict(servers)
+        self.resolver.lifetime = timeout
+
+    def mail_status(self, domain):
+        """Returns (status, mail hosts) for a domain."""
+        try:
+            answer = self.resolver.resolve(domain, 'MX')
+            hosts = sorted((r.preference, r.exchange.to_text().rstrip('.')) for r in answer)
+            if all(not host for _, host in hosts):
+                return NO_MAIL, []  # RFC 7505 null MX: the domain accepts no mail
+            return OK, [host for _, host in hosts if host]
+        except dns.resolver.NXDOMAIN:
+            return NO_MAIL, []
+        except dns.resolver.NoAnswer:
+            pass
+        except (dns.exception.Timeout, dns.resolver.NoNameservers) as e:
+            return DNS_ERROR, [str(e)]
+        # No MX record: mail falls back to the domain's A record (RFC 5321).
+        try:
+            self.resolver.resolve(domain, 'A')
+            return OK, [domain]
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+            return NO_MAIL, []
+        except (dns.exception.Timeout, dns.resolver.NoNameservers) as e:
+            return DNS_ERROR, [str(e)]
+
+class DomainScreen:
+    """
+    Cheap checks run before an address costs a verifier credit: syntax, then
+    a per-domain mail lookup cached in the contact store with a TTL, plus
+    domains the verifier has already told us are catch-all.
+    """
+    def __init__(self, store, resolver=None):
+        self.store = store
+        self.resolver = resolver or DnsResolver()
+        self.lookups = 0
+
+    def domain_status(self, domain):
+        domain = domain.lower()
+        cached = self.store.get_domain(domain)
+        if cached and cached['expires_at'] > time.time():
+            return cached['status']
+        self.lookups += 1
+        status, hosts = self.resolver.mail_status(domain)
+        ttl = DNS_ERROR_TTL if status == DNS_ERROR else DOMAIN_TTL
+        self.store.put_domain(domain, status, hosts, ttl)
+        return status
+
+    def check(self, email):
+        """Returns one of OK, BAD_SYNTAX, NO_MAIL, CATCH_ALL or DNS_ERROR."""
+        if not valid_syntax(email):
+            return BAD_SYNTAX
+        return self.domain_status(email.rsplit('@', 1)[1])
+
+    def mark_catch_all(self, domain):
+        self.store.put_domain(domain.lower(), CATCH_ALL, [], CATCH_ALL_TTL)
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+import concurrent.futures
+import json
+import re
+import threading
+from collections import Counter, defaultdict
+from urllib.parse import urljoin, unquote
+import requests
+from bs4 import BeautifulSoup
+import browser_pool
+import metrics
+
+# --- CONFIGURATION ---
+EMAIL_PATTERN = browser_pool.EMAIL_PATTERN
+STATIC_TIMEOUT = 15
+# Longest a browser lookup may take (two page loads plus the wait for a free page),
+# kept under the lookup queue's lease so a stuck browser can't hang a worker.
+BROWSER_LOOKUP_TIMEOUT = 300
+# Pages with less visible text than this are treated as client-rendered shells.
+MIN_STATIC_TEXT = 400
+# Cloudflare's email obfuscation: the address is XOR-encoded into the page and decoded by JS.
+CF_EMAIL_PATH = '/cdn-cgi/l/email-protection'
+TIERS = ['directory', 'static', 'browser', 'none']
+
+def _clean_email(value):
+    if not value:
+        return None
+    value = unquote(value).replace('mailto:', '').split('?')[0].strip()
+    match = re.fullmatch(EMAIL_PATTERN, value)
+    return match.group(0) if match else None
+
+def decode_cfemail(encoded):
+    """Decodes a Cloudflare-protected address: the first hex byte is the XOR key for the rest."""
+    try:
+        data = bytes.fromhex(encoded)
+        return _clean_email(bytes(b ^ data[0] for b in data[1:]).decode('utf-8')) if data else None
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def _protected_email(tag):
+    """The address behind a Cloudflare-protected element or link, if any."""
+    encoded = tag.get('data-cfemail')
+    if not encoded and CF_EMAIL_PATH in tag.get('href', ''):
+        encoded = tag['href'].partition('#')[2]
+    return decode_cfemail(encoded) if encoded else None
+
+def _is_protected(tag):
+    return tag.has_attr('data-cfemail') or CF_EMAIL_PATH in tag.get('href', '')
+
+def _names_match(text, author_name):
+    return bool(text) and author_name.casefold() in ' '.join(text.split()).casefold()
+
+def _json_ld_people(soup):
+    """Yields every Person-like dict found in the page's JSON-LD blocks."""
+    def walk(node):
+        if isinstance(node, list):
+            for item in node:
+                yield from walk(item)
+        elif isinstance(node, dict):
+            if node.get('@type') == 'Person' or 'email' in node:
+                yield node
+            for key in ('@graph', 'author', 'creator', 'mainEntity'):
+                if key in node:
+                    yield from walk(node[key])
+    for script in soup.find_all('script', type='application/ld+json'):
+        try:
+            data = json.loads(script.string or '')
+        except ValueError:
+            continue
+        yield from walk(data)
+
+def extract_author(soup, page_url, author_name):
+    """
+    Looks for the author's email or bio page in server-rendered HTML.
+    Returns (email, author_page_url); either may be None.
+    """
+    author_page_url = None
+    for person in _json_ld_people(soup):
+        if not _names_match(person.get('name'), author_name):
+            continue
+        email = _clean_email(person.get('email'))
+        if email:
+            return email, None
+        if isinstance(person.get('url'), str):
+            author_page_url = urljoin(page_url, person['url'])
+
+    for link in soup.find_all('a', href=True):
+        if not _names_match(link.get_text(' '), author_name):
+            continue
+        if link['href'].startswith('mailto:') or _is_protected(link):
+            email = _clean_email(link['href']) if link['href'].startswith('mailto:') else _protected_email(link)
+            if email:
+                return email, None
+        elif not author_page_url:
+            author_page_url = urljoin(page_url, link['href'])
+
+    if not author_page_url:
+        for tag in soup.find_all(['meta', 'link']):
+            key = tag.get('property') or tag.get('name') or ' '.join(tag.get('rel') or [])
+            value = tag.get('content') or tag.get('href') or ''
+            if key in ('article:author', 'author') and value.startswith(('http', '/')):
+                author_page_url = urljoin(page_url, value)
+                break
+    return None, author_page_url
+
+def extract_page_email(soup):
+    """
+    Finds an email on an author page: JSON-LD, then mailto: links, then
+    Cloudflare-protected addresses, then visible text.
+    """
+    for person in _json_ld_people(soup):
+        email = _clean_email(person.get('email'))
+        if email:
+            return email
+    for link in soup.find_all('a', href=True):
+        if link['href'].startswith('mailto:'):
+            email = _clean_email(link['href'])
+            if email:
+                return email
+    for tag in soup.find_all(_is_protected):
+        email = _protected_email(tag)
+        if email:
+            return email
+    match = re.search(EMAIL_PATTERN, soup.get_text(' '))
+    return match.group(0) if match else None
+
+class EmailFinder:
+    """
+    Finds an author's email in tiers. The static tier fetches the article
+    (and bio page) over the shared HTTP session and parses the raw HTML;
+    only when that is inconclusive, or the outlet is marked "js_only", does
+    the lookup go to the headless browser. Chromium is started on first use;
+    a browser_pool_size of 0 turns the browser tier off. Before any of that,
+    an optional staff directory (see staff_directory.py) is consulted. With
+    a CrawlScheduler, every page visit is paced per site and pages that
+    robots.txt disallows are left alone. With an AuthorPageCache, a bio page
+    already read (whether or not it had an email) is not loaded again.
+    """
+    def __init__(self, session, browser_pool_size=browser_pool.DEFAULT_POOL_SIZE, log=print, directory=None,
+                 scheduler=None, cache=None):
+        self.session = session
+        self.directory = directory
+        self.scheduler = scheduler
+        self.cache = cache
+        self.browser_pool_size = browser_pool_size
+        self.log = log
+        self._pool = None
+        self._browser_failed = False
+        self._lock = threading.Lock()
+        self.counts = defaultdict(Counter)  # outlet -> tier -> lookups
+
+    def _browser(self):
+        with self._lock:
+            if self._pool is None and not self._browser_failed and self.browser_pool_size > 0:
+                try:
+                    self._pool = browser_pool.BrowserPool(size=self.browser_pool_size, log=self.log,
+                                                         scheduler=self.scheduler, cache=self.cache).start()
+                except Exception as e:
+                    self.log(f"!!! Could not start the headless browser, browser tier disabled: {e}")
+                    self._browser_failed = True
+            return None if self._browser_failed else self._pool
+
+    def close(self):
+        if self._pool:
+            stats = self._pool.stats()
+            self.log(f"Browser pool: {stats['pages']} pages in {stats['seconds']}s "
+                     f"({stats['pages_per_sec']} pages/sec), {stats['recycled']} pages recycled.")
+            self._pool.close()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _allowed(self, url):
+        return not self.scheduler or self.scheduler.allowed(url)
+
+    def _get_soup(self, url):
+        if self.scheduler:
+            self.scheduler.acquire(url)
+        with metrics.timer('static_page_fetch'):
+            response = self.session.get(url, timeout=STATIC_TIMEOUT)
+            response.raise_for_status()
+        return BeautifulSoup(response.content, 'lxml')
+
+    def find_static(self, article_url, author_name):
+        """
+        Returns (email, conclusive). `conclusive` is False when the HTML could
+        not be fetched or looks client-rendered, meaning a browser might do better.
+        """
+        try:
+            soup = self._get_soup(article_url)
+            if len(soup.get_text(' ', strip=True)) < MIN_STATIC_TEXT or not _names_match(soup.get_text(' '), author_name):
+                return None, False
+            email, author_page_url = extract_author(soup, article_url, author_name)
+            if email:
+                return email, True
+            if not author_page_url:
+                return None, False
+            self.log(f"  -> [static] Found author page: {author_page_url}")
+            if not self._allowed(author_page_url):
+                # The browser would have to visit the same page, so stop here.
+                self.log(f"  -> [static] robots.txt disallows {author_page_url}.")
+                return None, True
+            if self.cache:
+                found, email = self.cache.get(author_page_url)
+                if found:
+                    return email, True
+            author_soup = self._get_soup(author_page_url)
+            email = extract_page_email(author_soup)
+            # A protected address we couldn't decode is there for the browser to reveal.
+            conclusive = bool(email) or (len(author_soup.get_text(' ', strip=True)) >= MIN_STATIC_TEXT
+                                         and author_soup.find(_is_protected) is None)
+            if self.cache and conclusive:
+                # A client-rendered shell isn't cached; the browser may still find an email there.
+                self.cache.put(author_page_url, email)
+            return email, conclusive
+        except requests.exceptions.RequestException as e:
+            metrics.count('static_fetch_errors')
+            self.log(f"  -> [static] Could not fetch page for {author_name}: {e}")
+            return None, False
+
+    def find_email(self, outlet, article_url, author_name):
+        """Returns (email or None, tier that settled the lookup)."""
+        with metrics.timer('email_lookup', outlet=outlet['outlet']) as labels:
+            email, tier = self._find_email(outlet, article_url, author_name)
+            labels['tier'] = tier
+        return email, tier
+
+    def _find_email(self, outlet, article_url, author_name):
+        if self.directory:
+            email = self.directory.find(outlet['outlet'], author_name)
+            if email:
+                self._count(outlet['outlet'], 'directory')
+                return email, 'directory'
+        if not self._allowed(article_url):
+            self.log(f"  -> robots.txt disallows {article_url}. Skipping {author_name}.")
+            self._count(outlet['outlet'], 'none')
+            return None, 'none'
+        if not outlet.get('js_only'):
+            email, conclusive = self.find_static(article_url, author_name)
+            if email or conclusive:
+                tier = 'static' if email else 'none'
+                self._count(outlet['outlet'], tier)
+                return email, tier
+        pool = self._browser()
+        if not pool:
+            self._count(outlet['outlet'], 'none')
+            return None, 'none'
+        future = pool.find_email(article_url, author_name)
+        try:
+            with metrics.timer('browser_lookup', outlet=outlet['outlet']):
+                email = future.result(timeout=BROWSER_LOOKUP_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            metrics.count('browser_timeouts')
+            raise
+        except browser_pool.BrowserPoolBroken as e:
+            with self._lock:
+                self._browser_failed = True
+            self.log(f"!!! {e}. Browser tier disabled.")
+            self._count(outlet['outlet'], 'none')
+            return None, 'none'
+        tier = 'browser' if email else 'none'
+        self._count(outlet['outlet'], tier, browser_visit=True)
+        return email, tier
+
+    def _count(self, outlet_name, tier, browser_visit=False):
+        with self._lock:
+            self.counts[outlet_name][tier] += 1
+            if browser_visit:
+                self.counts[outlet_name]['browser_visits'] += 1
+
+    def report(self):
+        """Logs which tier resolved each outlet's lookups."""
+        if not self.counts:
+            return
+        self.log("\nEmail lookups by tier (directory / static / browser / none, browser visits):")
+        for outlet, counts in sorted(self.counts.items()):
+            self.log(f"  {outlet}: {counts['directory']} / {counts['static']} / {counts['browser']} / {counts['none']}, "
+                     f"{counts['browser_visits']} visits")
+        lookups = sum(sum(counts[t] for t in TIERS) for counts in self.counts.values())
+        visits = sum(counts['browser_visits'] for counts in self.counts.values())
+        self.log(f"  Browser visits avoided: {lookups - visits} of {lookups} lookups.")
+        if self.cache:
+            self.log(f"  Author-page cache: {self.cache.describe()}.")
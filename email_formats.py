@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+# --- CONFIGURATION ---
+# How each address format is built from the name parts.
+FORMATS = {
+    'first.last': '{first}.{last}',
+    'f.last': '{f}.{last}',
+    'flast': '{f}{last}',
+    'firstlast': '{first}{last}',
+    'first_last': '{first}_{last}',
+    'first-last': '{first}-{last}',
+    'firstl': '{first}{l}',
+    'first': '{first}',
+    'last.first': '{last}.{first}',
+    'lastf': '{last}{f}',
+}
+# Rough newsroom-wide priors, used until an outlet has its own evidence.
+DEFAULT_PRIOR = {
+    'first.last': 0.36, 'f.last': 0.14, 'flast': 0.16, 'firstlast': 0.08, 'first_last': 0.03,
+    'first-last': 0.02, 'firstl': 0.05, 'first': 0.06, 'last.first': 0.05, 'lastf': 0.05,
+}
+PRIOR_STRENGTH = 3.0      # How many observations the prior is worth.
+BLACKLIST_WEIGHT = 0.5    # A rejected guess is weaker evidence than a verified address.
+FOREIGN_DOMAIN_PENALTY = 0.5
+# Verified addresses on an unrelated domain needed before it replaces the outlet's own for guesses.
+MIN_DOMAIN_EVIDENCE = 3
+# Personal mailboxes (freelancers, columnists) say nothing about an outlet's address scheme.
+FREE_MAIL_DOMAINS = {'gmail.com', 'googlemail.com', 'yahoo.com', 'yahoo.ca', 'yahoo.co.uk', 'ymail.com',
+                     'hotmail.com', 'hotmail.ca', 'hotmail.co.uk', 'outlook.com', 'live.com', 'live.ca', 'msn.com',
+                     'icloud.com', 'me.com', 'mac.com', 'aol.com', 'protonmail.com', 'proton.me', 'gmx.com',
+                     'mail.com', 'fastmail.com', 'shaw.ca', 'rogers.com', 'sympatico.ca', 'bell.net', 'telus.net'}
+# Second-level suffixes under which the registrable domain has three labels (thestar.co.uk).
+SECOND_LEVEL_SUFFIXES = {'co.uk', 'org.uk', 'ac.uk', 'gov.uk', 'com.au', 'net.au', 'org.au', 'co.nz', 'co.za',
+                         'com.br', 'co.in', 'co.jp'}
+
+def _fold(text):
+    """Lowercases, strips accents and drops everything but letters and digits."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r'[^a-z0-9]', '', text.lower())
+
+def name_parts(first_name, last_name):
+    """Returns the folded (first, last) used to build addresses. Middle initials are dropped."""
+    surname = [p for p in (last_name or '').split() if len(p.rstrip('.')) > 1]
+    return _fold(first_name), _fold(''.join(surname))
+
+def render(fmt, first, last):
+    if not first or (not last and '{l' in FORMATS[fmt]):
+        return None
+    return FORMATS[fmt].format(first=first, last=last, f=first[0], l=last[:1])
+
+def detect_formats(local_part, first_name, last_name):
+    """Returns the formats that produce `local_part` for this name."""
+    first, last = name_parts(first_name, last_name)
+    local_part = (local_part or '').lower()
+    return [fmt for fmt in FORMATS if render(fmt, first, last) == local_part]
+
+def _shape_formats(local_part):
+    """Formats an address *could* follow when we only have the address (blacklist entries)."""
+    if re.fullmatch(r'[a-z]\.[a-z0-9]+', local_part):
+        return ['f.last']
+    if re.fullmatch(r'[a-z0-9]{2,}\.[a-z0-9]+', local_part):
+        return ['first.last', 'last.first']
+    if '_' in local_part:
+        return ['first_last']
+    if '-' in local_part:
+        return ['first-last']
+    if re.fullmatch(r'[a-z0-9]+', local_part):
+        return ['flast', 'firstlast', 'firstl', 'first', 'lastf']
+    return []
+
+def web_domain(url):
+    """'https://www.thestar.com/' -> 'thestar.com'"""
+    host = url.split('/')[2] if '//' in url else url
+    return host.lower().replace('www.', '')
+
+def registrable_domain(domain):
+    """'mail.thestar.com' -> 'thestar.com', 'news.bbc.co.uk' -> 'bbc.co.uk'"""
+    labels = domain.lower().strip('.').split('.')
+    size = 3 if '.'.join(labels[-2:]) in SECOND_LEVEL_SUFFIXES else 2
+    return '.'.join(labels[-size:])
+
+class EmailFormatModel:
+    """
+    Learns each outlet's address format(s) and mail domain from the verified
+    master list, using blacklisted guesses as negative evidence, and turns
+    that into ranked guesses with a confidence between 0 and 1.
+    """
+    def __init__(self):
+        self.positives = defaultdict(Counter)   # outlet -> format -> count
+        self.negatives = defaultdict(Counter)   # mail domain -> format -> weight
+        self.domain_positives = defaultdict(Counter)
+        self.mail_domains = defaultdict(Counter)  # outlet -> domain -> count
+        self.global_formats = Counter()
+        self._last_contact = self._last_blacklisted = 0
+
+    @classmethod
+    def from_store(cls, store):
+        model = cls()
+        model.refresh(store)
+        return model
+
+    def refresh(self, store):
+        """Learns from the contacts and blacklisted guesses added to the store since the last refresh."""
+        for contact_id, row in store.contacts_after(self._last_contact):
+            self.add_verified(row[7], row[0], row[1], row[2])
+            self._last_contact = contact_id
+        for rowid, email in store.blacklist_after(self._last_blacklisted):
+            self.add_rejected(email)
+            self._last_blacklisted = rowid
+
+    def add_verified(self, outlet, first_name, last_name, email):
+        if '@' not in (email or ''):
+            return
+        local_part, domain = email.lower().rsplit('@', 1)
+        if domain in FREE_MAIL_DOMAINS:
+            return
+        self.mail_domains[outlet][domain] += 1
+        for fmt in detect_formats(local_part, first_name, last_name):
+            self.positives[outlet][fmt] += 1
+            self.domain_positives[domain][fmt] += 1
+            self.global_formats[fmt] += 1
+
+    def add_rejected(self, email):
+        if '@' not in (email or ''):
+            return
+        local_part, domain = email.lower().rsplit('@', 1)
+        shapes = _shape_formats(local_part)
+        for fmt in shapes:
+            self.negatives[domain][fmt] += BLACKLIST_WEIGHT / len(shapes)
+
+    # --- Inference ---
+    def mail_domain(self, outlet, default_domain):
+        """
+        The domain this outlet's staff actually receive mail on. A learned
+        domain replaces the website's when it is the same site
+        (mail.thestar.com) or, for an unrelated one (a parent company's),
+        once it has MIN_DOMAIN_EVIDENCE verified addresses; either way it
+        needs more of them than the website's own domain.
+        """
+        counts = self.mail_domains[outlet]
+        best, best_count = default_domain, counts.get(default_domain, 0)
+        site = registrable_domain(default_domain)
+        for domain, count in counts.most_common():
+            if count > best_count and (registrable_domain(domain) == site or count >= MIN_DOMAIN_EVIDENCE):
+                best, best_count = domain, count
+        return best
+
+    def _prior(self):
+        total = sum(self.global_formats.values())
+        if not total:
+            return DEFAULT_PRIOR
+        # Blend what we've seen across all outlets with the default prior.
+        return {fmt: (self.global_formats[fmt] + PRIOR_STRENGTH * DEFAULT_PRIOR[fmt]) / (total + PRIOR_STRENGTH)
+                for fmt in FORMATS}
+
+    def format_probabilities(self, outlet, domain):
+        prior = self._prior()
+        scores = {}
+        for fmt in FORMATS:
+            pos = self.positives[outlet][fmt] + self.domain_positives[domain][fmt]
+            neg = self.negatives[domain][fmt]
+            scores[fmt] = (pos + PRIOR_STRENGTH * prior[fmt]) / (pos + neg + PRIOR_STRENGTH)
+        total = sum(scores.values())
+        return {fmt: score / total for fmt, score in scores.items()}
+
+    def guesses(self, outlet, default_domain, first_name, last_name, limit=3, explicit=False):
+        """
+        Returns up to `limit` (email, confidence) pairs, best first. With
+        `explicit`, default_domain is the outlet's configured email_domain
+        and is used as is.
+        """
+        domain = default_domain if explicit else self.mail_domain(outlet, default_domain)
+        first, last = name_parts(first_name, last_name)
+        ranked = {}
+        for fmt, probability in self.format_probabilities(outlet, domain).items():
+            local_part = render(fmt, first, last)
+            if local_part:
+                email = f"{local_part}@{domain}"
+                ranked[email] = ranked.get(email, 0.0) + probability
+        best = sorted(ranked.items(), key=lambda item: item[1], reverse=True)
+        return [(email, round(confidence, 3)) for email, confidence in best[:limit]]
+
+    def confidence(self, outlet, first_name, last_name, email):
+        """Scores an address that is already in the pending queue."""
+        if '@' not in (email or ''):
+            return 0.0
+        local_part, domain = email.lower().rsplit('@', 1)
+        probabilities = self.format_probabilities(outlet, domain)
+        score = sum(probabilities[fmt] for fmt in detect_formats(local_part, first_name, last_name))
+        if self.mail_domains[outlet] and domain not in self.mail_domains[outlet]:
+            score *= FOREIGN_DOMAIN_PENALTY
+        return round(score, 3)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+import json
+import os
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# --- CONFIGURATION ---
+FEED_CACHE_FILE = os.getenv('FEED_CACHE_FILE', os.path.join(SCRIPT_DIR, 'feed_cache.json'))
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'cmp', 'cmpid',
+                   'ref', 'ref_src', 'rss', 'rssfeed', 'taid', 'yptr', 'ito', 'itm_source'}
+TRACKING_PREFIXES = ('utm_', 'itm_', 'pk_', 'mtm_')
+
+def normalize_article_url(url):
+    """
+    Reduces an article URL to a stable key: lowercase host without 'www.',
+    no fragment, no trailing slash and no tracking parameters.
+    """
+    if not url:
+        return ''
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)]
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit(('https' if parts.scheme in ('http', 'https') else parts.scheme,
+                       host, path, urlencode(sorted(query)), ''))
+
+def article_keys(link, guid=None):
+    """Returns every key an article can be recognised by (its URL and its GUID)."""
+    keys = set()
+    link_key = normalize_article_url(link)
+    keys.add(link_key)
+    if guid:
+        guid = guid.strip()
+        if guid.startswith(('http://', 'https://')):
+            keys.add(normalize_article_url(guid))
+        else:
+            # Bare GUIDs are often just numeric ids, so scope them to the site.
+            keys.add(f"guid:{urlsplit(link_key).netloc}:{guid}")
+    keys.discard('')
+    return keys
+
+class FeedCache:
+    """
+    Remembers each feed's ETag / Last-Modified so the next run can send a
+    conditional GET and skip feeds that answer 304 Not Modified.
+    """
+    def __init__(self, filename=FEED_CACHE_FILE):
+        self.filename = filename
+        self._entries = {}
+        self._lock = threading.Lock()
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+    def request_headers(self, rss_url):
+        with self._lock:
+            entry = self._entries.get(rss_url, {})
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def update(self, rss_url, response):
+        """Stores the validators from a 200 response. Call once the feed has been processed."""
+        entry = {'etag': response.headers.get('ETag'),
+                 'last_modified': response.headers.get('Last-Modified')}
+        with self._lock:
+            if entry['etag'] or entry['last_modified']:
+                self._entries[rss_url] = entry
+            else:
+                self._entries.pop(rss_url, None)
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self._entries, indent=2, sort_keys=True)
+        tmp = f"{self.filename}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp, self.filename)
+
+class SeenArticles:
+    """
+    Index of normalised article URLs / GUIDs already processed, kept in the
+    contact store. Keys added during a run are held in memory (so the same
+    story in two feeds is caught immediately) and written in one batch by save().
+    Safe to share between feed workers when the store was opened threaded.
+    """
+    def __init__(self, store):
+        self.store = store
+        self._new_keys = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return self.store.count('seen_articles') + len(self._new_keys)
+
+    def is_seen(self, link, guid=None):
+        return self._is_seen_keys(article_keys(link, guid))
+
+    def _is_seen_keys(self, keys):
+        with self._lock:
+            return bool(keys & self._new_keys) or self.store.seen_article(keys)
+
+    def add(self, link, guid=None):
+        with self._lock:
+            self._new_keys.update(article_keys(link, guid))
+
+    def batch(self):
+        """A SeenBatch for one feed, read in a worker and committed once its leads are queued."""
+        return SeenBatch(self)
+
+    def commit(self, batch):
+        """Marks a feed's articles seen and writes them out."""
+        with self._lock:
+            self._new_keys.update(batch.keys)
+        self.save()
+
+    def save(self):
+        with self._lock:
+            if self._new_keys:
+                self.store.add_seen_articles(self._new_keys)
+                self._new_keys = set()
+
+class SeenBatch:
+    """
+    The articles read from one feed, kept apart from SeenArticles until the
+    feed's searches are queued, so a crash in between can't lose a lead.
+    Checks its own keys, then everything seen so far.
+    """
+    def __init__(self, seen):
+        self.seen = seen
+        self.keys = set()
+
+    def is_seen(self, link, guid=None):
+        keys = article_keys(link, guid)
+        return bool(keys & self.keys) or self.seen._is_seen_keys(keys)
+
+    def add(self, link, guid=None):
+        self.keys.update(article_keys(link, guid))
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from lxml import etree
+import names
+
+# --- CONFIGURATION ---
+# Feeds are newest-first, so this many already-processed items in a row
+# means everything below them was handled on an earlier run.
+STOP_AFTER_SEEN = 5
+DC_CREATOR = '{http://purl.org/dc/elements/1.1/}creator'
+DC_DATE = '{http://purl.org/dc/elements/1.1/}date'
+
+def split_authors(author_string, outlet_names=frozenset()):
+    """
+    'By Jane Doe and John Roe, Sam Poe' -> ['Jane Doe', 'John Roe', 'Sam Poe'].
+    Wire services, desks, job titles and outlets ('The Canadian Press',
+    'Staff Reporter', 'Calgary Herald') are dropped; see names.clean_byline.
+    """
+    parts = re.split(r'\s*[,;&]\s*|\s+(?:and|et)\s+', author_string.strip())
+    return [name for name in (names.clean_byline(part, outlet_names) for part in parts) if name]
+
+def parse_date(value):
+    """RFC 822 pubDate or ISO 8601 dc:date -> aware datetime (or None)."""
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def _text(item, tag):
+    element = item.find(tag)
+    if element is None or not element.text:
+        return None
+    return element.text.strip() or None
+
+def iter_leads(source, seen_articles=None, stop_after_seen=STOP_AFTER_SEEN, item_dates=None,
+               outlet_names=frozenset()):
+    """
+    Streams <item>s out of an RSS document and yields one lead per author.
+
+    `source` is a file-like object (e.g. a streamed response's raw body), so
+    only one item is held in memory at a time. Items already in
+    `seen_articles` are skipped, and after `stop_after_seen` of them in a
+    row the rest of the feed is not read at all. Every other item with a
+    link is added to `seen_articles`, including wire stories whose byline
+    yields no leads, so they count towards that run next time. If `item_dates` is a list,
+    the publication time of every item read (seen or not) is appended to it.
+    `outlet_names` is passed on to split_authors.
+    """
+    seen_run = 0
+    parser = etree.iterparse(source, events=('end',), tag='item', recover=True,
+                             resolve_entities=False, no_network=True, huge_tree=True)
+    try:
+        for _, item in parser:
+            author = _text(item, DC_CREATOR) or _text(item, 'author')
+            link = _text(item, 'link')
+            title = _text(item, 'title')
+            guid = _text(item, 'guid')
+            if item_dates is not None:
+                published = parse_date(_text(item, 'pubDate') or _text(item, DC_DATE))
+                if published:
+                    item_dates.append(published)
+
+            # Drop the finished item (and any siblings before it) so memory stays flat.
+            item.clear()
+            parent = item.getparent()
+            while parent is not None and item.getprevious() is not None:
+                del parent[0]
+
+            if not link:
+                continue
+            if seen_articles is not None:
+                if seen_articles.is_seen(link, guid):
+                    seen_run += 1
+                    if stop_after_seen and seen_run >= stop_after_seen:
+                        return
+                    continue
+                seen_articles.add(link, guid)
+            seen_run = 0
+            if not (author and title):
+                continue
+            for name in split_authors(author, outlet_names):
+                yield {'name': name, 'link': link, 'title': title, 'guid': guid}
+    except etree.XMLSyntaxError:
+        # Nothing recoverable left in the document; keep what we already yielded.
+        return
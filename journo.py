@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+One entry point for the whole pipeline:
+
+    python3 journo.py scrape [--daemon] [--region UK] [--shard 2/4]
+    python3 journo.py lookups [--workers 4]
+    python3 journo.py validate
+    python3 journo.py sync
+    python3 journo.py run-all [--region UK]
+    python3 journo.py stats
+
+Each subcommand imports only the modules it needs, so `stats` and `sync`
+never load Playwright, BeautifulSoup or the verifier client.
+"""
+import argparse
+import sys
+from datetime import datetime
+
+def log(message):
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    print(f"[{timestamp}] {message}")
+
+def scrape(argv):
+    import monitor
+    return monitor.main(argv) or 0
+
+def lookups(argv):
+    import discovery_queue
+    return discovery_queue.main(argv)
+
+def validate(args):
+    import validate_emails
+    return validate_emails.main()
+
+def sync(args):
+    import sheets_outbox
+    return sheets_outbox.main()
+
+def run_all(args):
+    """Scrape, email lookups, validation and Sheets sync in one process, sharing one store,
+    HTTP session, browser pool and Sheets login."""
+    import monitor
+    import validate_emails
+    outlets = monitor.REGISTRY.outlets(args.region)
+    log(f"--- Starting full run: {len(outlets)} outlets, then validation ---")
+    runner = monitor.Monitor(job='run-all')
+    try:
+        runner.run_cycle(outlets)
+        if validate_emails.API_KEY:
+            log("\n--- Validating pending guesses ---")
+            validate_emails.validate(runner.store, runner.syncer, runner.registry)
+        else:
+            log("EMAIL_VERIFY_KEY is not set; skipping validation.")
+        monitor.report_metrics(runner.job)
+    finally:
+        runner.close()
+    log("--- Full run finished ---")
+    return 0
+
+def stats(args):
+    """Queue sizes and the last run of each job, read straight from the store and metrics files."""
+    import glob
+    import json
+    import os
+    import contact_store
+    import discovery_queue
+    import metrics
+    import outlet_registry
+    store = contact_store.ContactStore()
+    try:
+        print(f"Store: {store.filename}")
+        print(f"  Verified contacts:   {store.count('contacts')}")
+        pending = store.pending_counts()
+        print(f"  Pending guesses:     {sum(pending.values())} "
+              f"({', '.join(f'{n} {status}' for status, n in sorted(pending.items())) or 'none'})")
+        print(f"  Blacklisted emails:  {store.count('blacklist')}")
+        print(f"  Articles seen:       {store.count('seen_articles')}")
+        print(f"  Staff directory:     {store.count('staff_directory')} emails")
+        print(f"  Author-page cache:   {store.count('author_pages')} pages")
+        print(f"  Email search queue:  {discovery_queue.describe_counts(store.lookup_counts())}")
+        for worksheet in outlet_registry.OutletRegistry().worksheets():
+            print(f"  Sheets outbox '{worksheet}': {store.outbox_count(worksheet)} rows")
+    finally:
+        store.close()
+    for path in sorted(glob.glob(os.path.join(metrics.METRICS_DIR, '*.json'))):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                summary = json.load(f)
+            finished = datetime.fromtimestamp(summary['finished_at']).strftime('%Y-%m-%d %H:%M:%S')
+        except (OSError, ValueError, KeyError):
+            continue
+        print(f"Last '{summary.get('job')}' run: {finished} ({summary.get('duration_seconds')}s)")
+    return 0
+
+def main(argv=None):
+    import outlet_registry
+    parser = argparse.ArgumentParser(prog='journo', description="Journalist contact scraper and validator.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    for name, func, help_text in (
+            ('scrape', scrape, "poll the RSS feeds and find emails for new bylines (monitor.py)"),
+            ('lookups', lookups, "work through the queued email searches (discovery_queue.py)")):
+        # Their own options (and --help) are handed to the wrapped script's parser.
+        commands.add_parser(name, help=help_text, add_help=False).set_defaults(func=func, passthrough=True)
+    commands.add_parser('validate', help="verify pending guesses with the API (validate_emails.py)").set_defaults(func=validate)
+    commands.add_parser('sync', help="upload the Google Sheets outbox (sheets_outbox.py)").set_defaults(func=sync)
+    command = commands.add_parser('run-all', help="scrape, validate and sync in one process")
+    command.add_argument('--region', action='append', choices=sorted(outlet_registry.OutletRegistry().regions),
+                         help="only scrape outlets in this region (repeatable)")
+    command.set_defaults(func=run_all)
+    commands.add_parser('stats', help="show queue sizes and when each job last ran").set_defaults(func=stats)
+    args, rest = parser.parse_known_args(argv)
+    if getattr(args, 'passthrough', False):
+        return args.func(rest)
+    if rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# --- CONFIGURATION ---
+METRICS_DIR = os.getenv('METRICS_DIR', os.path.join(SCRIPT_DIR, 'metrics'))
+# Set METRICS_PROFILE=1 to also capture cProfile stats of the instrumented hot paths.
+PROFILE = os.getenv('METRICS_PROFILE', '') not in ('', '0')
+PREFIX = 'journo_'
+QUANTILES = [0.5, 0.9, 0.99]
+MAX_SAMPLES = 1000    # Latency samples kept per series for percentiles, so a daemon's memory stays flat.
+
+class Timer:
+    """Count, total and recent samples of one timed operation."""
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=MAX_SAMPLES)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+    def quantile(self, q):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class Metrics:
+    """
+    Thread-safe counters and timers, each keyed by a name and labels such as
+    outlet="Toronto Star". At the end of a run they are written as a JSON
+    summary and as a Prometheus textfile (for node_exporter's textfile collector).
+    """
+    def __init__(self, profile=PROFILE):
+        self.started_at = time.time()
+        self.counters = {}
+        self.timers = {}
+        self.profile = profile
+        self._profiler = cProfile.Profile() if profile else None
+        self._profiled = False
+        self._profile_lock = threading.Lock()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+    def count(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.timers.setdefault(key, Timer()).observe(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Times the block, including when it raises. Labels can be added inside via the yielded dict."""
+        start = time.perf_counter()
+        with self._profiling():
+            try:
+                yield labels
+            finally:
+                self.observe(name, time.perf_counter() - start, **labels)
+
+    @contextmanager
+    def _profiling(self):
+        """
+        Python 3.12+ allows only one active profiler per process, so one
+        block is profiled at a time and blocks running meanwhile in other
+        threads are skipped. If another profiler or debugger already holds
+        the hook, profiling is switched off rather than failing the run.
+        """
+        if not self.profile or getattr(self._local, 'depth', 0) or not self._profile_lock.acquire(blocking=False):
+            yield
+            return
+        try:
+            self._profiler.enable()
+            enabled = True
+        except ValueError:
+            self.profile = enabled = False
+        if not enabled:
+            self._profile_lock.release()
+            yield
+            return
+        self._profiled = True
+        self._local.depth = 1
+        try:
+            yield
+        finally:
+            self._profiler.disable()
+            self._local.depth = 0
+            self._profile_lock.release()
+
+    def total(self, name):
+        """A counter summed over all its labels."""
+        with self._lock:
+            return sum(value for (n, _), value in self.counters.items() if n == name)
+
+    def slowest(self, names, label, limit=5):
+        """(label value, total seconds) for the label values that spent longest in the named timers."""
+        totals = {}
+        with self._lock:
+            for (n, labels), timer in self.timers.items():
+                value = dict(labels).get(label)
+                if n in names and value is not None:
+                    totals[value] = totals.get(value, 0.0) + timer.total
+        return sorted(totals.items(), key=lambda item: -item[1])[:limit]
+
+    def summary(self, job):
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            timers = [{'name': name, 'labels': dict(labels), 'count': t.count, 'total_seconds': round(t.total, 4),
+                       'max_seconds': round(t.max, 4),
+                       **{f'p{int(q * 100)}_seconds': round(t.quantile(q), 4) for q in QUANTILES}}
+                      for (name, labels), t in sorted(self.timers.items())]
+        return {'job': job, 'started_at': self.started_at, 'finished_at': time.time(),
+                'duration_seconds': round(time.time() - self.started_at, 3),
+                'counters': counters, 'timers': timers}
+
+    def prometheus(self, job):
+        """The metrics in Prometheus text exposition format."""
+        def labels_text(labels):
+            labels = (('job', job),) + labels
+            return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels) + '}'
+
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f'# TYPE {PREFIX}{name}_total counter')
+                for (n, labels), value in sorted(self.counters.items()):
+                    if n == name:
+                        lines.append(f'{PREFIX}{name}_total{labels_text(labels)} {value}')
+            for name in sorted({name for name, _ in self.timers}):
+                lines.append(f'# TYPE {PREFIX}{name}_seconds summary')
+                for (n, labels), t in sorted(self.timers.items()):
+                    if n != name:
+                        continue
+                    for q in QUANTILES:
+                        lines.append(f'{PREFIX}{name}_seconds{labels_text(labels + (("quantile", str(q)),))} {t.quantile(q):.6f}')
+                    lines.append(f'{PREFIX}{name}_seconds_sum{labels_text(labels)} {t.total:.6f}')
+                    lines.append(f'{PREFIX}{name}_seconds_count{labels_text(labels)} {t.count}')
+        lines.append(f'# TYPE {PREFIX}last_run_timestamp_seconds gauge')
+        lines.append(f'{PREFIX}last_run_timestamp_seconds{labels_text(())} {time.time():.0f}')
+        lines.append(f'# TYPE {PREFIX}run_duration_seconds gauge')
+        lines.append(f'{PREFIX}run_duration_seconds{labels_text(())} {time.time() - self.started_at:.3f}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, job, directory=METRICS_DIR):
+        """
+        Writes <job>.json, <job>.prom and, when profiling, <job>.prof into
+        `directory`. Files are replaced atomically so a scraper never reads
+        half of one. Returns the paths written.
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = [_write_atomic(os.path.join(directory, f'{job}.json'), json.dumps(self.summary(job), indent=2)),
+                 _write_atomic(os.path.join(directory, f'{job}.prom'), self.prometheus(job))]
+        if self._profiled:
+            with self._profile_lock:
+                stats = pstats.Stats(self._profiler)
+            path = os.path.join(directory, f'{job}.prof')
+            stats.dump_stats(path)
+            paths.append(path)
+        return paths
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _write_atomic(path, text):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+    return path
+
+# One registry per process; the pipeline modules record into it.
+registry = Metrics()
+
+def count(name, value=1, **labels):
+    registry.count(name, value, **labels)
+
+def observe(name, seconds, **labels):
+    registry.observe(name, seconds, **labels)
+
+def timer(name, **labels):
+    return registry.timer(name, **labels)
@@ -1,13 +1,27 @@
 #!/usr/bin/env python3
-import requests
-from bs4 import BeautifulSoup
-import csv
-import time
-import re
-from playwright.sync_api import sync_playwright, TimeoutError
+import argparse
 import os
+import signal
+import threading
+import time
 from datetime import datetime
-import sheets_client
+import sheets_outbox
+import contact_store
+import feed_fetcher
+import feed_parser
+import feed_cache
+import email_formats
+import browser_pool
+import email_finder
+import poll_schedule
+import metrics
+import names
+import outlet_registry
+import discovery_queue
+import staff_directory
+import crawl_scheduler
+import author_cache
+from concurrent.futures import ThreadPoolExecutor
 
 # --- HELPER FUNCTION ---
 def log(message):
@@ -15,314 +29,263 @@ def log(message):
     print(f"[{timestamp}] {message}")
 
 # --- CONFIGURATION ---
-MASTER_LIST_FILE = 'master_journalist_list.csv'
-PENDING_FILE = 'pending_verification.csv'
-BLACKLIST_FILE = 'blacklist_emails.txt'
+FEED_CONCURRENCY = int(os.getenv('FEED_CONCURRENCY', feed_fetcher.DEFAULT_CONCURRENCY))
+FEED_PER_HOST_LIMIT = int(os.getenv('FEED_PER_HOST_LIMIT', feed_fetcher.DEFAULT_PER_HOST_LIMIT))
+BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', browser_pool.DEFAULT_POOL_SIZE))
+EMAIL_LOOKUP_CONCURRENCY = int(os.getenv('EMAIL_LOOKUP_CONCURRENCY', 8))
+# Names stored this long before the previous cycle's check are looked at again, in case
+# another process's write committed just after that check read the store.
+NAME_SYNC_OVERLAP = 60
 HEADERS = {'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/88.0.4324.150 Safari/537.36'}
-OUTLET_SOURCES = [
-    # National
-    {
-        "outlet": "The Globe and Mail", "url": "https://www.theglobeandmail.com/", "location": "National",
-        "rss_url": "https://www.theglobeandmail.com/arc/outboundfeeds/rss/?outputType=xml"
-    },
-    {
-        "outlet": "National Post", "url": "https://nationalpost.com/", "location": "National",
-        "rss_url": "https://nationalpost.com/feed"
-    },
-    {
-        "outlet": "The Walrus", "url": "https://thewalrus.ca/", "location": "National",
-        "rss_url": "https://thewalrus.ca/feed/"
-    },
-    {
-        "outlet": "BNN Bloomberg", "url": "https://www.bnnbloomberg.ca/", "location": "National",
-        "rss_url": "https://www.bnnbloomberg.ca/rss/news/bnn-s-top-stories-1.1044434"
-    },
-    {
-        "outlet": "Canada's National Observer", "url": "https://www.nationalobserver.com/", "location": "National",
-        "rss_url": "https://www.nationalobserver.com/front/rss"
-    },
-    {
-        "outlet": "Canadaland", "url": "https://www.canadaland.com/", "location": "National",
-        "rss_url": "https://www.canadaland.com/feed/"
-    },
-    {
-        "outlet": "The Hill Times", "url": "https://www.hilltimes.com/", "location": "National (Ottawa)",
-        "rss_url": "https://www.hilltimes.com/feed/"
-    },
-    # British Columbia
-    {
-        "outlet": "The Vancouver Sun", "url": "https://vancouversun.com/", "location": "British Columbia",
-        "rss_url": "https://vancouversun.com/feed"
-    },
-    {
-        "outlet": "The Tyee", "url": "https://thetyee.ca/", "location": "British Columbia",
-        "rss_url": "https://thetyee.ca/rss2.xml"
-    },
-    {
-        "outlet": "Vancouver Is Awesome", "url": "https://www.vancouverisawesome.com/", "location": "British Columbia",
-        "rss_url": "https://www.vancouverisawesome.com/rss"
-    },
-    {
-        "outlet": "Castanet (Most Recent)", "url": "https://www.castanet.net/", "location": "British Columbia",
-        "rss_url": "https://www.castanet.net/rss/mostrecent.xml"
-    },
-    {
-        "outlet": "Castanet (Top Headlines)", "url": "https://www.castanet.net/", "location": "British Columbia",
-        "rss_url": "https://www.castanet.net/rss/topheadlines.xml"
-    },
-    # Alberta
-    {
-        "outlet": "Calgary Herald", "url": "https://calgaryherald.com/", "location": "Alberta",
-        "rss_url": "https://calgaryherald.com/feed"
-    },
-    {
-        "outlet": "Edmonton Journal", "url": "https://edmontonjournal.com/", "location": "Alberta",
-        "rss_url": "https://edmontonjournal.com/feed"
-    },
-    # Saskatchewan & Manitoba
-    {
-        "outlet": "Regina Leader-Post", "url": "https://leaderpost.com/", "location": "Saskatchewan",
-        "rss_url": "https://leaderpost.com/feed"
-    },
-    {
-        "outlet": "Saskatoon StarPhoenix", "url": "https://thestarphoenix.com/", "location": "Saskatchewan",
-        "rss_url": "https://thestarphoenix.com/feed"
-    },
-    {
-        "outlet": "Winnipeg Free Press", "url": "https://www.winnipegfreepress.com/", "location": "Manitoba",
-        "rss_url": "https://www.winnipegfreepress.com/rss/?path=%2F"
-    },
-    # Ontario
-    {
-        "outlet": "Toronto Star", "url": "https://www.thestar.com/", "location": "Ontario",
-        "rss_url": "https://www.thestar.com/feed/"
-    },
-    {
-        "outlet": "Ottawa Citizen", "url": "https://ottawacitizen.com/", "location": "Ontario",
-        "rss_url": "https://ottawacitizen.com/feed"
-    },
-    {
-        "outlet": "The Hamilton Spectator", "url": "https://www.thespec.com/", "location": "Ontario",
-        "rss_url": "https://www.thespec.com/rss/"
-    },
-    {
-        "outlet": "TVO (TVOntario)", "url": "https://www.tvo.org/", "location": "Ontario",
-        "rss_url": "https://www.tvo.org/rss/articles/all"
-    },
-    {
-        "outlet": "Guelph Today", "url": "https://www.guelphtoday.com/", "location": "Ontario",
-        "rss_url": "https://www.guelphtoday.com/rss"
-    },
-    # Quebec
-    {
-        "outlet": "La Presse", "url": "https://www.lapresse.ca/", "location": "Quebec",
-        "rss_url": "https://www.lapresse.ca/actualites/rss"
-    },
-    {
-        "outlet": "Montreal Gazette", "url": "https://montrealgazette.com/", "location": "Quebec",
-        "rss_url": "https://montrealgazette.com/feed"
-    },
-    # Atlantic Canada
-    {
-        "outlet": "SaltWire Network", "url": "https://www.saltwire.com/", "location": "Atlantic Canada",
-        "rss_url": "https://www.saltwire.com/feed/"
-    },
-    # The North
-    {
-        "outlet": "Cabin Radio", "url": "https://cabinradio.ca/", "location": "Northwest Territories",
-        "rss_url": "https://cabinradio.ca/feed/"
-    },
-    {
-        "outlet": "Nunatsiaq News", "url": "https://nunatsiaq.com/", "location": "Nunavut / Nunavik",
-        "rss_url": "https://nunatsiaq.com/feed/"
-    }
-]
-
-def get_existing_journalists():
-    journalists = set()
-    for filename in [MASTER_LIST_FILE, PENDING_FILE]:
-        try:
-            with open(filename, 'r', newline='', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                next(reader, None)
-                for row in reader:
-                    if row and len(row) > 1:
-                        journalists.add(f"{row[0]} {row[1]}".lower())
-        except FileNotFoundError:
-            pass
-    return journalists
-
-def get_blacklist_emails():
-    blacklist = set()
-    try:
-        with open(BLACKLIST_FILE, 'r', encoding='utf-8') as f:
-            for line in f:
-                email = line.strip().lower()
-                if email:
-                    blacklist.add(email)
-    except FileNotFoundError:
-        pass
-    return blacklist
-
-def find_email_with_playwright(article_url, author_name):
-    """Uses an OPTIMIZED headless browser to find a real email."""
-    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    found_email = None
-
-    def block_unnecessary_resources(route):
-        """Intercepts network requests and blocks non-essential ones."""
-        blocked_resource_types = ['image', 'stylesheet', 'font', 'media', 'csp_report']
-        if route.request.resource_type in blocked_resource_types:
-            route.abort()
-        else:
-            route.continue_()
-    
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch()
-            page = browser.new_page()
-            page.route('**/*', block_unnecessary_resources)
-
-            log(f"  -> Visiting article (Optimized): {article_url}")
-            page.goto(article_url, timeout=60000, wait_until='domcontentloaded') 
-
-            author_link = page.get_by_text(author_name, exact=False).first
-            if author_link and author_link.get_attribute('href'):
-                author_page_url = author_link.get_attribute('href')
-
-                if 'mailto:' in author_page_url:
-                    log("  -> SUCCESS! Found a direct mailto: link.")
-                    found_email = author_page_url.replace('mailto:', '').strip()
-                    browser.close()
-                    return found_email
+# Outlets live in outlets.json (see outlet_registry.py); set "js_only": true on an outlet
+# whose article pages only render in a real browser.
+REGISTRY = outlet_registry.OutletRegistry()
+OUTLET_SOURCES = REGISTRY.outlets()
 
-                if author_page_url.startswith('/'):
-                    base_url = '/'.join(article_url.split('/')[:3])
-                    author_page_url = f"{base_url}{author_page_url}"
-                
-                log(f"  -> Found author page, navigating to: {author_page_url}")
-                page.goto(author_page_url, timeout=60000, wait_until='domcontentloaded')
+class Monitor:
+    """
+    Everything a scrape needs, kept warm between cycles: the contact store,
+    the pooled HTTP session, the staff directory, the email finder (and its
+    browser pool), the dedupe indexes and the Sheets client.
+    """
+    def __init__(self, registry=REGISTRY, shard=None, job=None):
+        self.registry = registry
+        # Feeds credit stories to their own outlet ("Calgary Herald"); those bylines aren't people.
+        self.outlet_names = {names.byline_phrase(o['outlet']) for o in registry.outlets()}
+        # Shards poll disjoint feeds, so each keeps its own feed cache and metrics files.
+        self.job = job or (f"monitor-shard{shard[0]}of{shard[1]}" if shard else 'monitor')
+        self.store = contact_store.ContactStore()
+        imported = self.store.import_csvs()
+        if imported:
+            log(f"Imported legacy files into {self.store.filename}: {imported}")
+        cache_root, cache_ext = os.path.splitext(feed_cache.FEED_CACHE_FILE)
+        self.feeds = feed_cache.FeedCache(f"{cache_root}.shard{shard[0]}of{shard[1]}{cache_ext}" if shard
+                                          else feed_cache.FEED_CACHE_FILE)
+        # Feed workers check it while they parse, so it gets its own shareable connection.
+        self.seen_articles = feed_cache.SeenArticles(contact_store.ContactStore(self.store.filename, threaded=True))
+        self.session = feed_fetcher.create_session(HEADERS, pool_size=FEED_PER_HOST_LIMIT)
+        self.fetcher = feed_fetcher.FeedFetcher(self.session, concurrency=FEED_CONCURRENCY,
+                                                per_host_limit=FEED_PER_HOST_LIMIT, cache=self.feeds,
+                                                parse=self._read_feed)
+        self.scheduler = crawl_scheduler.CrawlScheduler(self.session, log=log)
+        self.author_pages = author_cache.AuthorPageCache(self.store.filename)
+        self.directory = staff_directory.StaffDirectory(self.store, self.session, log=log, scheduler=self.scheduler)
+        self.finder = email_finder.EmailFinder(self.session, browser_pool_size=BROWSER_POOL_SIZE, log=log,
+                                               directory=self.directory, scheduler=self.scheduler,
+                                               cache=self.author_pages)
+        self.lookup_pool = ThreadPoolExecutor(max_workers=EMAIL_LOOKUP_CONCURRENCY)
+        self.lookups = discovery_queue.LookupWorker(self.store, self.finder, self.lookup_pool,
+                                                    EMAIL_LOOKUP_CONCURRENCY, log=log)
+        self.syncer = sheets_outbox.SheetsSync(self.store, log=log)
+        # Built once, then topped up each cycle with what was stored since.
+        self.format_model = email_formats.EmailFormatModel.from_store(self.store)
+        self._names_synced_at = time.time()
+        # Everyone already known, plus names queued since, matched loosely
+        # so "Jane A. Doe" or "JÉRÔME CÔTÉ" don't cost another lookup.
+        self.known_journalists = names.NameIndex(self.store.journalist_names())
 
-            page_content = page.locator('body').inner_text()
-            match = re.search(email_pattern, page_content)
-            
-            if match:
-                found_email = match.group(0)
-            
-            browser.close()
-    except TimeoutError:
-        log("  -> Page still timed out, even with optimization. Skipping this author.")
-    except Exception as e:
-        log(f"  -> An error occurred during headless browsing: {e}")
-    
-    return found_email
+    def close(self):
+        self.lookup_pool.shutdown()
+        self.finder.close()
+        self.author_pages.close()
+        self.seen_articles.store.close()
+        self.store.close()
 
-def parse_rss_for_leads(content):
-    """Parses RSS feed to get a list of leads, splitting multiple authors."""
-    leads = []
-    soup = BeautifulSoup(content, 'xml')
-    articles = soup.find_all('item')
-    for article in articles:
-        author_tag = article.find('dc:creator') or article.find('author')
-        link_tag = article.find('link')
-        title_tag = article.find('title')
-        if not (author_tag and author_tag.string and link_tag and link_tag.string and title_tag and title_tag.string):
-            continue
-        author_string = author_tag.string.strip()
-        author_names = re.split(r'\s*,\s*|\s+and\s+', author_string)
-        article_link = link_tag.string.strip()
-        article_title = title_tag.string.strip()
-        for name in author_names:
-            name = name.strip()
-            if name:
-                leads.append({'name': name, 'link': article_link, 'title': article_title})
-    return leads
+    def _refresh_known(self):
+        """
+        Folds in contacts, blacklisted guesses and names stored since the last
+        cycle (by this run's lookups, the validator or another shard).
+        """
+        self.format_model.refresh(self.store)
+        since, self._names_synced_at = self._names_synced_at - NAME_SYNC_OVERLAP, time.time()
+        for name in self.store.journalist_names(added_since=since):
+            if not self.known_journalists.find(name):
+                self.known_journalists.add(name)
 
-def write_results(filename, results_list, header):
-    """Helper to write results, ensuring header exists."""
-    if not results_list: return
-    write_header = not os.path.exists(filename) or os.path.getsize(filename) == 0
-    log(f"\nAppending {len(results_list)} entries to local file: {filename}.")
-    with open(filename, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        if write_header: writer.writerow(header)
-        writer.writerows(results_list)
+    def _read_feed(self, outlet, response):
+        """
+        Runs in a feed worker: reads the bylines off the body as it downloads,
+        stopping early at articles already seen. A feed that fails mid-read
+        keeps the leads read so far, with the error alongside.
+        """
+        feed = {'response': response, 'leads': [], 'item_dates': [], 'seen': self.seen_articles.batch(),
+                'error': None}
+        if response.status_code == 304:
+            return feed
+        parse_started = time.perf_counter()
+        try:
+            for lead in feed_parser.iter_leads(response.raw, feed['seen'], item_dates=feed['item_dates'],
+                                               outlet_names=self.outlet_names):
+                feed['leads'].append(lead)
+        except Exception as e:
+            feed['error'] = e
+        metrics.observe('feed_parse', time.perf_counter() - parse_started, outlet=outlet['outlet'])
+        return feed
 
-def main():
-    log("--- Starting Journalist Monitor (Local with Cloud Sync) ---")
-    existing_journalists = get_existing_journalists()
-    blacklist_emails = get_blacklist_emails()
-    log(f"Loaded {len(existing_journalists)} existing journalists.")
-    log(f"Loaded {len(blacklist_emails)} emails in the Blacklist filter.")
+    def run_cycle(self, outlets, schedule=None):
+        """
+        Polls the given outlets once, finds emails for new bylines and syncs
+        the results. The caller reports metrics (report_metrics) when its run is done.
+        """
+        store = self.store
+        log(f"Store has {store.count('contacts')} verified and {store.count('pending')} pending journalists.")
+        log(f"Loaded {store.count('blacklist')} emails in the Blacklist filter.")
+        self.directory.refresh(outlets)
+        self._refresh_known()
+        format_model, known_journalists = self.format_model, self.known_journalists
+        log(f"Indexed {len(known_journalists)} known journalist names.")
+        log(f"Fetching {len(outlets)} feeds ({FEED_CONCURRENCY} at a time, {FEED_PER_HOST_LIMIT} per host).")
 
-    new_verified_journalists = []
-    new_pending_journalists = []
-    HEADER = ['First_Name', 'Last_Name', 'Email', 'City', 'State', 'Country', 'phone', 'publications', 'title', 'topics', 'twitter', 'link']
-    
-    for outlet in OUTLET_SOURCES:
-        if not outlet.get('rss_url'): continue
-        log(f"\nChecking: {outlet['outlet']}")
-        try:
-            response = requests.get(outlet['rss_url'], headers=HEADERS, timeout=15)
-            response.raise_for_status()
-            leads = parse_rss_for_leads(response.content)
-            for lead in leads:
+        for outlet, feed, error in self.fetcher.fetch_all(outlets):
+            log(f"\nChecking: {outlet['outlet']}")
+            if error:
+                log(f"-> Error fetching RSS for {outlet['outlet']}: {error}")
+                if schedule:
+                    schedule.record_error(outlet)
+                continue
+            response = feed['response']
+            if response.status_code == 304:
+                log("-> Feed not modified since last run. Skipping.")
+                if schedule:
+                    schedule.record(outlet, 0, [])
+                continue
+            jobs = []
+            for lead in feed['leads']:
                 full_name = lead['name']
-                if not full_name.strip() or full_name.lower() in existing_journalists:
+                known_as = known_journalists.find(full_name)
+                if known_as:
+                    if known_as != full_name:
+                        metrics.count('fuzzy_duplicates', outlet=outlet['outlet'])
                     continue
-                name_parts = full_name.split()
-                if not name_parts: continue
-                first_name = name_parts[0]
-                last_name = ' '.join(name_parts[1:]) if len(name_parts) > 1 else ''
-                domain = outlet['url'].split('/')[2].replace('www.', '')
-                email_guess = f"{first_name[0].lower()}.{last_name.lower().replace(' ', '')}@{domain}"
-                if email_guess.lower() in blacklist_emails:
-                    log(f"  -> Skipping author {full_name}: Guessed email is blacklisted.")
-                    existing_journalists.add(full_name.lower())
+                first_name, last_name = names.split_name(full_name)
+                if not first_name: continue
+                domain = outlet.get('email_domain') or email_formats.web_domain(outlet['url'])
+                guesses = [(email, confidence) for email, confidence
+                           in format_model.guesses(outlet['outlet'], domain, first_name, last_name,
+                                                   explicit=bool(outlet.get('email_domain')))
+                           if not store.is_blacklisted(email)]
+                if not guesses:
+                    metrics.count('authors_blacklisted', outlet=outlet['outlet'])
+                    log(f"  -> Skipping author {full_name}: All guessed emails are blacklisted.")
+                    known_journalists.add(full_name)
                     continue
-                log(f"\nFound new author: {full_name}. Searching for real email...")
-                real_email = find_email_with_playwright(lead['link'], full_name)
-                
+                email_guess = guesses[0][0]
+                metrics.count('new_authors', outlet=outlet['outlet'])
+                log(f"Found new author: {full_name}. Queueing search for real email...")
                 journalist_record = [
-                    first_name, last_name, "N/A", '', outlet.get('location', ''), 'Canada', '',
+                    first_name, last_name, email_guess, '', outlet.get('location', ''), outlet.get('country', 'Canada'), '',
                     outlet['outlet'], lead['title'], lead['link'], ''
                 ]
-                if real_email:
-                    log(f"  -> SUCCESS! Found real email: {real_email}")
-                    journalist_record[2] = real_email
-                    new_verified_journalists.append(journalist_record)
-                else:
-                    log("  -> No public email found. Generating guess for API validation.")
-                    journalist_record[2] = email_guess
-                    new_pending_journalists.append(journalist_record)
-                existing_journalists.add(full_name.lower())
-                time.sleep(1)
-        except requests.exceptions.RequestException as e:
-            log(f"-> Error fetching RSS for {outlet['outlet']}: {e}")
+                jobs.append({'name': full_name, 'outlet': outlet, 'article_url': lead['link'],
+                             'record': journalist_record})
+                known_journalists.add(full_name)
+            # Checkpoint the feed (even a partly read one): queue its searches, then mark its
+            # articles seen. Queued names count as known, so nothing here is searched twice.
+            store.enqueue_lookups(jobs)
+            self.seen_articles.commit(feed['seen'])
+            if feed['error']:
+                # A dropped connection mid-stream only loses the rest of this feed.
+                log(f"-> Error reading RSS for {outlet['outlet']}: {feed['error']}")
+                metrics.count('feed_read_errors', outlet=outlet['outlet'])
+                if schedule:
+                    schedule.record_error(outlet)
+                continue
+            lead_count = len(feed['leads'])
+            log(f"-> {lead_count} bylines on unseen articles.")
+            metrics.count('leads', lead_count, outlet=outlet['outlet'])
+            self.feeds.update(outlet['rss_url'], response)
+            if schedule:
+                schedule.record(outlet, lead_count, feed['item_dates'])
 
-    if new_verified_journalists:
-        write_results(MASTER_LIST_FILE, new_verified_journalists, HEADER)
+        self.feeds.save()
 
-    if new_pending_journalists:
-        write_results(PENDING_FILE, new_pending_journalists, HEADER)
-    
-    if new_verified_journalists:
-        log("\nConnecting to Google Sheets to sync new verified journalists...")
-    # 1. Create an instance of the class first
-        client = sheets_client.GoogleSheetsClient()
+        # Also picks up searches a crashed or interrupted earlier run left behind.
+        log(f"\nWorking through the lookup queue ({discovery_queue.describe_counts(store.lookup_counts())})...")
+        found, queued = self.lookups.found, self.lookups.queued
+        self.lookups.drain()
+        self.finder.report()
+        log(f"\nAdded {self.lookups.found - found} verified journalists to the contact store.")
+        log(f"Queued {self.lookups.queued - queued} guessed emails for validation.")
+
+        log("\nSyncing new verified journalists to Google Sheets...")
+        uploaded, deduped = self.syncer.uploaded, self.syncer.deduped
+        for worksheet in self.registry.worksheets():
+            self.syncer.sync(worksheet)
+        log(f"Uploaded {self.syncer.uploaded - uploaded} rows, "
+            f"skipped {self.syncer.deduped - deduped} already in the sheet.")
+
+def report_metrics(job='monitor'):
+    """Logs the lead funnel and slowest outlets, then writes the run's metrics files."""
+    registry = metrics.registry
+    leads, authors = registry.total('leads'), registry.total('new_authors')
+    found = registry.total('emails_found')
+    share = f" ({found / leads:.0%} of bylines)" if leads else ''
+    log(f"\nRun so far: {leads} bylines, {authors} new authors, {found} emails found{share}, "
+        f"{registry.total('guesses_queued')} guesses queued, {registry.total('fuzzy_duplicates')} near-duplicate names "
+        f"skipped, {registry.total('browser_timeouts')} browser timeouts.")
+    # feed_fetch already includes the streamed parse (feed_parse), so that isn't added twice.
+    slowest = registry.slowest(('feed_fetch', 'email_lookup'), 'outlet')
+    if slowest:
+        log("Slowest outlets (seconds spent): " + ', '.join(f"{name} {seconds:.1f}" for name, seconds in slowest))
+    try:
+        log(f"Metrics written to {', '.join(registry.write(job))}")
+    except OSError as e:
+        log(f"Could not write metrics files: {e}")
 
-    # 2. Call the correct method on that instance
-        master_ws = client.get_worksheet("master_list")
-        if master_ws:
+def run_daemon(monitor, outlets):
+    """Polls each feed on its own adaptive interval until SIGINT / SIGTERM."""
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    schedule = poll_schedule.PollSchedule(outlets, store=monitor.store)
+    log(f"Daemon mode: watching {len(schedule.outlets)} feeds. Press Ctrl+C to stop.")
+    while not stop.is_set():
+        due = schedule.due()
+        if due:
+            log(f"\n=== Cycle: {len(due)} feeds due ({', '.join(o['outlet'] for o in due)}) ===")
             try:
-                log(f"Uploading {len(new_verified_journalists)} new rows to 'master_list' sheet...")
-                master_ws.append_rows(new_verified_journalists)
-                log("Google Sheets sync successful.")
+                monitor.run_cycle(due, schedule)
             except Exception as e:
-                log(f"Google Sheets sync failed: {e}")
+                log(f"!!! Cycle failed: {type(e).__name__}: {e}")
+                for outlet in due:
+                    schedule.record_error(outlet)
+            schedule.save()
+            report_metrics(monitor.job)
+            log("Polling intervals (minutes): " + ', '.join(f"{name} {minutes}" for name, minutes in schedule.summary()))
+        stop.wait(min(schedule.seconds_until_next(), 60))
+    schedule.save()
+
+def shard_spec(value):
+    try:
+        return outlet_registry.parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape news RSS feeds for new journalist bylines.")
+    parser.add_argument('--daemon', action='store_true',
+                        help="keep running and poll each feed on its own adaptive interval")
+    parser.add_argument('--region', action='append', choices=sorted(REGISTRY.regions),
+                        help="only watch outlets in this region (repeatable; default: all)")
+    parser.add_argument('--shard', type=shard_spec, metavar='INDEX/COUNT',
+                        help="only watch this worker's share of the outlets, e.g. 2/4")
+    args = parser.parse_args(argv)
+
+    outlets = REGISTRY.outlets(args.region)
+    if args.shard:
+        outlets = outlet_registry.select_shard(outlets, *args.shard)
+    log("--- Starting Journalist Monitor (Local with Cloud Sync) ---")
+    log(f"Watching {len(outlets)} outlets" + (f" (shard {args.shard[0]}/{args.shard[1]})." if args.shard else "."))
+    monitor = Monitor(shard=args.shard)
+    log(f"Loaded {len(monitor.seen_articles)} previously processed article keys.")
+    try:
+        if args.daemon:
+            run_daemon(monitor, outlets)
         else:
-            log("Skipping Google Sheets sync due to connection failure.")
-    
+            monitor.run_cycle(outlets)
+            report_metrics(monitor.job)
+    finally:
+        monitor.close()
     log("--- Monitor Finished ---")
 
 if __name__ == "__main__":
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+# --- CONFIGURATION ---
+HONORIFICS = {'dr', 'mr', 'mrs', 'ms', 'mx', 'prof', 'rev', 'hon', 'sir', 'dame'}
+SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv', 'phd', 'md', 'qc', 'kc'}
+# A byline containing one of these phrases (as whole words) is a wire service, desk or job
+# title, not a person. Single words are only listed when no one is likely to be called that,
+# so "Mary Press" and "Dan Bloomberg" stay people.
+AGENCY_PHRASES = {'the canadian press', 'canadian press', 'associated press', 'press association',
+                  'agence france presse', 'afp', 'reuters', 'bloomberg news', 'bloomberg opinion', 'postmedia',
+                  'presse canadienne', 'la presse canadienne', 'local journalism initiative', 'news services',
+                  'news service', 'wire services', 'wire service', 'news agency', 'news wire', 'newswire',
+                  'staff writer', 'staff writers', 'staff reporter', 'staff reporters', 'staff report',
+                  'news staff', 'editorial board', 'news desk', 'special correspondent', 'contributing writer',
+                  'guest columnist', 'with files from'}
+# Bylines that are only one of these words are a desk or job title.
+DESK_BYLINES = {'staff', 'bloomberg', 'ap', 'cp', 'news', 'wire', 'wires', 'newsroom', 'editorial', 'editors',
+                'editor', 'reporter', 'reporters', 'columnist', 'correspondent', 'contributor', 'photographer'}
+NON_PERSON_PREFIXES = ('special to ', 'for the ', 'with files from ', 'from ', 'the ')
+MIN_SIMILARITY = 0.85    # difflib ratio above which two name parts count as the same spelling.
+# Full first name -> the short forms it is published under. Only these pairs count as the same
+# person; "Chris" is not assumed to be "Christine", nor "Ann" to be "Annette".
+NICKNAMES = {
+    'alexander': {'alex', 'sandy'}, 'alexandra': {'alex', 'sandra'}, 'andrew': {'andy', 'drew'},
+    'anthony': {'tony'}, 'benjamin': {'ben'}, 'catherine': {'cathy', 'kate', 'katie'},
+    'christopher': {'chris'}, 'daniel': {'dan', 'danny'}, 'david': {'dave'}, 'deborah': {'deb', 'debbie'},
+    'edward': {'ed', 'eddie', 'ted'}, 'elizabeth': {'liz', 'beth', 'betsy', 'eliza'}, 'gregory': {'greg'},
+    'james': {'jim', 'jamie', 'jimmy'}, 'jennifer': {'jen', 'jenny'}, 'jonathan': {'jon'},
+    'joseph': {'joe', 'joey'}, 'katherine': {'kathy', 'kate', 'katie'}, 'kenneth': {'ken', 'kenny'},
+    'margaret': {'maggie', 'meg', 'peggy'}, 'matthew': {'matt'}, 'michael': {'mike', 'mick'},
+    'nicholas': {'nick'}, 'patricia': {'pat', 'patty', 'trish'}, 'patrick': {'pat'}, 'peter': {'pete'},
+    'rebecca': {'becky', 'becca'}, 'richard': {'rich', 'rick', 'dick'}, 'robert': {'rob', 'bob', 'bobby', 'robbie'},
+    'samantha': {'sam'}, 'samuel': {'sam'}, 'stephen': {'steve'}, 'steven': {'steve'}, 'susan': {'sue', 'suzy'},
+    'thomas': {'tom', 'tommy'}, 'timothy': {'tim'}, 'victoria': {'vicky', 'tori'}, 'william': {'will', 'bill', 'billy'},
+}
+
+def fold(text):
+    """Lowercases and strips accents: 'Jérôme Côté' -> 'jerome cote'."""
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in text if not unicodedata.combining(c)).casefold()
+
+def byline_phrase(text):
+    """How clean_byline compares phrases: 'Agence France-Presse' -> 'agence france presse'."""
+    return ' '.join(re.findall(r'[a-z0-9]+', fold(text)))
+
+def clean_byline(name, outlet_names=frozenset()):
+    """
+    Turns one split byline into a person's name, or None when it isn't one.
+    'By Jane Doe' -> 'Jane Doe'; 'Postmedia News' and 'Local Journalism
+    Initiative Reporter' -> None. `outlet_names` (byline_phrase() of each
+    watched outlet) drops bylines like 'Calgary Herald' or 'Calgary Herald Staff'.
+    """
+    name = re.sub(r'\S+@\S+|\(.*?\)', ' ', name or '')
+    name = re.sub(r'^\s*(by|par)\s+', '', name, flags=re.IGNORECASE)
+    name = ' '.join(name.strip(' \t|-–—:').split())
+    folded = fold(name)
+    if not name or folded.startswith(NON_PERSON_PREFIXES):
+        return None
+    words = byline_phrase(name).split()
+    runs = {' '.join(words[i:j]) for i in range(len(words)) for j in range(i + 1, len(words) + 1)}
+    if ' '.join(words) in DESK_BYLINES or runs & AGENCY_PHRASES or runs & outlet_names:
+        return None
+    if not re.search(r'[^\W\d_]{2,}', name):
+        return None
+    return name
+
+def name_tokens(name):
+    """'Dr. Jane A. Doe-Smith Jr.' -> ['jane', 'a', 'doesmith']"""
+    tokens = re.sub(r"['’.]", '', fold(name))
+    tokens = re.sub(r'[^a-z0-9]+', ' ', tokens.replace('-', '')).split()
+    return [t for t in tokens if t not in HONORIFICS and t not in SUFFIXES]
+
+def name_key(name):
+    """
+    A key that only equal names share: folded tokens with middle initials
+    dropped. 'Jane A. Doe' and 'JANE DOE' -> 'jane doe'; a name that is
+    only an initial and a surname ('J. Doe') has no key.
+    """
+    tokens = name_tokens(name)
+    if len(tokens) < 2 or len(tokens[0]) == 1:
+        return None
+    return ' '.join([tokens[0]] + [t for t in tokens[1:-1] if len(t) > 1] + [tokens[-1]])
+
+def split_name(name):
+    """
+    (first name, last name) as written, without honorifics, suffixes or
+    middle initials: 'Dr. Jane A. Doe' -> ('Jane', 'Doe').
+    """
+    words = [w for w in name.split() if re.sub(r'[^a-z]', '', fold(w)) not in HONORIFICS | SUFFIXES]
+    if len(words) > 2:
+        # Drop middle initials ("A." or "A"), keep real middle names as part of the last name.
+        words = [words[0]] + [w for w in words[1:-1] if len(w.strip('.')) > 1] + [words[-1]]
+    if not words:
+        return '', ''
+    return words[0], ' '.join(words[1:])
+
+_FULL_NAMES = defaultdict(set)
+for _full, _nicknames in NICKNAMES.items():
+    for _nickname in _nicknames:
+        _FULL_NAMES[_nickname].add(_full)
+
+def _related_names(first):
+    """A first name with its nicknames, or a nickname with the full names it is short for."""
+    return NICKNAMES.get(first, set()) | _FULL_NAMES.get(first, set())
+
+def _similar(a, b):
+    return a == b or (min(len(a), len(b)) >= 4 and SequenceMatcher(None, a, b).ratio() >= MIN_SIMILARITY)
+
+def _first_names_match(a, b):
+    if len(a) == 1 or len(b) == 1:
+        # "J. Roe" is only the same byline as another "J. Roe", never a guess at Jennifer or John.
+        return a == b
+    if a == b or b in _related_names(a):
+        return True
+    # A typo in a longer name ("Jenifer"), but not a different name that shares a stem ("Marko" / "Mark").
+    return min(len(a), len(b)) >= 5 and not (a.startswith(b) or b.startswith(a)) and _similar(a, b)
+
+class NameIndex:
+    """
+    Finds people already known under a slightly different spelling of their
+    name ("JANE DOE", "Jane A. Doe", "Jérôme" / "Jerome", a one-letter typo).
+    Names are bucketed by blocking keys, so a lookup only compares against
+    the handful of names sharing a key instead of every known name.
+    """
+    def __init__(self, names=()):
+        self.blocks = defaultdict(list)
+        self.size = 0
+        for name in names:
+            self.add(name)
+
+    @staticmethod
+    def _parts(name):
+        tokens = name_tokens(name)
+        if not tokens:
+            return None
+        return tokens[0], tokens[-1] if len(tokens) > 1 else ''
+
+    @staticmethod
+    def _keys(first, last):
+        # Same surname and first initial (or the initial of a nickname / full form: Bob -> Robert),
+        # or same first name and surname initial (catches surname typos).
+        initials = sorted({first[0]} | {name[0] for name in _related_names(first)})
+        return [('l', last, initial) for initial in initials] + [('f', first, last[:1])]
+
+    def add(self, name):
+        parts = self._parts(name)
+        if not parts:
+            return
+        for key in self._keys(*parts):
+            self.blocks[key].append((parts, name))
+        self.size += 1
+
+    def find(self, name):
+        """Returns the known name that `name` most likely refers to, or None."""
+        parts = self._parts(name)
+        if not parts:
+            return None
+        first, last = parts
+        for key in self._keys(first, last):
+            for (known_first, known_last), known in self.blocks.get(key, ()):
+                if _similar(last, known_last) and _first_names_match(first, known_first):
+                    return known
+        return None
+
+    def __contains__(self, name):
+        return self.find(name) is not None
+
+    def __len__(self):
+        return self.size
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+import hashlib
+import json
+import os
+from urllib.parse import urlsplit
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# --- CONFIGURATION ---
+OUTLETS_FILE = os.getenv('OUTLETS_FILE', os.path.join(SCRIPT_DIR, 'outlets.json'))
+DEFAULT_WORKSHEET = 'master_list'
+REQUIRED_FIELDS = ('outlet', 'url', 'rss_url')
+
+class OutletRegistry:
+    """
+    The outlets to watch, read from a JSON file instead of being hard-coded.
+
+    Each region sets defaults (country, Google Sheets worksheet) that every
+    outlet in it inherits; an outlet can override any of them, and can set
+    "js_only", "email_domain" (when mail goes to a different domain than the
+    website), "staff_urls" (the outlet's staff directory pages, when they
+    can't be found from its homepage) or "disabled".
+    """
+    def __init__(self, filename=OUTLETS_FILE):
+        self.filename = filename
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.regions = data.get('regions', {})
+        self._outlets = []
+        for i, outlet in enumerate(data.get('outlets', [])):
+            missing = [field for field in REQUIRED_FIELDS if not outlet.get(field)]
+            if missing:
+                raise ValueError(f"{filename}: outlet #{i + 1} ({outlet.get('outlet', '?')}) is missing {', '.join(missing)}")
+            region = outlet.get('region')
+            if region not in self.regions:
+                raise ValueError(f"{filename}: outlet '{outlet['outlet']}' has unknown region {region!r}")
+            self._outlets.append({'worksheet': DEFAULT_WORKSHEET, **self.regions[region], **outlet})
+
+    def outlets(self, regions=None):
+        """Enabled outlets, optionally only those in the given regions."""
+        return [o for o in self._outlets
+                if not o.get('disabled') and (not regions or o['region'] in regions)]
+
+    def worksheets(self):
+        return sorted({o['worksheet'] for o in self._outlets} | {DEFAULT_WORKSHEET})
+
+    def worksheet_for_country(self, country):
+        """Where a contact row (column 6 is the country) belongs in Google Sheets."""
+        for region in self.regions.values():
+            if region.get('country') == country:
+                return region.get('worksheet', DEFAULT_WORKSHEET)
+        return DEFAULT_WORKSHEET
+
+    def group_by_worksheet(self, rows):
+        grouped = {}
+        for row in rows:
+            grouped.setdefault(self.worksheet_for_country(row[5]), []).append(row)
+        return grouped
+
+def parse_shard(spec):
+    """'2/4' -> (2, 4): the second of four shards."""
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"shard must look like INDEX/COUNT, e.g. 2/4 (got {spec!r})")
+    if not 1 <= index <= count:
+        raise ValueError(f"shard index must be between 1 and {count} (got {spec!r})")
+    return index, count
+
+def shard_key(outlet):
+    """Outlets are sharded by feed host, so feeds on the same site stay with one worker."""
+    host = urlsplit(outlet['rss_url']).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+def in_shard(outlet, index, count):
+    # A stable hash (unlike hash()), so every worker and host agrees on the split.
+    digest = hashlib.sha1(shard_key(outlet).encode('utf-8')).hexdigest()
+    return int(digest, 16) % count == index - 1
+
+def select_shard(outlets, index, count):
+    return [o for o in outlets if in_shard(o, index, count)]
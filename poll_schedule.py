@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+import json
+import random
+import statistics
+import time
+
+# --- CONFIGURATION ---
+MIN_INTERVAL = 5 * 60         # Never poll a feed more often than this.
+MAX_INTERVAL = 6 * 3600       # Never leave a feed alone longer than this.
+DEFAULT_INTERVAL = 30 * 60    # Until we know a feed's rhythm.
+POLL_FRACTION = 0.5           # Poll at half the typical gap between stories.
+IDLE_BACKOFF = 1.5            # Stretch the interval after a poll with nothing new.
+GAP_SMOOTHING = 0.3           # EWMA weight given to the newest gap estimate.
+FIRST_POLL_SPREAD = 2 * 60    # Overdue or never-polled feeds are spread over this many seconds at startup.
+STATE_KEY = 'poll_schedule'
+
+class PollSchedule:
+    """
+    Gives every feed its own polling interval, learned from the timestamps
+    of the items it publishes. A busy feed like the Toronto Star settles near
+    MIN_INTERVAL, a quiet one like The Walrus drifts towards MAX_INTERVAL, and
+    a feed that returns nothing new backs off until it does.
+    """
+    def __init__(self, outlets, store=None):
+        self.store = store
+        self.outlets = {o['rss_url']: o for o in outlets if o.get('rss_url')}
+        saved = json.loads(store.get_meta(STATE_KEY, '{}')) if store else {}
+        now = time.time()
+        self.state = {}
+        for url in self.outlets:
+            entry = saved.get(url, {})
+            interval = entry.get('interval', DEFAULT_INTERVAL)
+            next_due = min(entry.get('next_due', now), now + interval)
+            if next_due <= now:
+                # Spread first polls out a little so a restart doesn't hit everything at once.
+                next_due = now + random.uniform(0, FIRST_POLL_SPREAD)
+            self.state[url] = {'interval': interval, 'gap': entry.get('gap'), 'next_due': next_due}
+
+    def due(self, now=None):
+        """Outlets whose next poll time has passed, most overdue first."""
+        now = now or time.time()
+        urls = sorted((url for url, s in self.state.items() if s['next_due'] <= now),
+                      key=lambda url: self.state[url]['next_due'])
+        return [self.outlets[url] for url in urls]
+
+    def seconds_until_next(self, now=None):
+        now = now or time.time()
+        return max(0.0, min(s['next_due'] for s in self.state.values()) - now) if self.state else MAX_INTERVAL
+
+    def record(self, outlet, new_items, item_dates, now=None):
+        """Updates one feed's interval after a poll."""
+        now = now or time.time()
+        entry = self.state[outlet['rss_url']]
+        timestamps = sorted({d.timestamp() for d in item_dates}, reverse=True)
+        gaps = [a - b for a, b in zip(timestamps, timestamps[1:]) if a > b]
+        if gaps:
+            observed = statistics.median(gaps)
+            entry['gap'] = observed if entry['gap'] is None else (
+                GAP_SMOOTHING * observed + (1 - GAP_SMOOTHING) * entry['gap'])
+        target = entry['gap'] * POLL_FRACTION if entry['gap'] else DEFAULT_INTERVAL
+        if new_items:
+            interval = target
+        else:
+            interval = max(target, entry['interval'] * IDLE_BACKOFF)
+        entry['interval'] = min(MAX_INTERVAL, max(MIN_INTERVAL, interval))
+        entry['next_due'] = now + entry['interval']
+
+    def record_error(self, outlet, now=None):
+        """A failed fetch is retried on the feed's normal interval, without learning from it."""
+        entry = self.state[outlet['rss_url']]
+        entry['next_due'] = (now or time.time()) + entry['interval']
+
+    def save(self):
+        """Merges this process's feeds into the saved state, so sharded daemons don't overwrite each other."""
+        if self.store:
+            with self.store.transaction():
+                saved = json.loads(self.store.get_meta(STATE_KEY, '{}'))
+                saved.update(self.state)
+                self.store.set_meta(STATE_KEY, json.dumps(saved))
+
+    def summary(self):
+        """(outlet name, minutes between polls) pairs, most frequent first."""
+        rows = [(self.outlets[url]['outlet'], round(s['interval'] / 60)) for url, s in self.state.items()]
+        return sorted(rows, key=lambda row: row[1])
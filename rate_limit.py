@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+import threading
+import time
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. `rate` tokens are added per second, up to
+    `capacity`; acquire() blocks until a token is free.
+    """
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, tokens=1):
+        """Seconds until `tokens` would be available (0 if they are now)."""
+        with self._lock:
+            self._refill()
+            missing = tokens - self._tokens
+        return max(0.0, missing / self.rate) if self.rate > 0 else float('inf')
+
+    def try_acquire(self, tokens=1):
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1):
+        while not self.try_acquire(tokens):
+            time.sleep(min(self.wait_time(tokens), 1.0) or 0.001)
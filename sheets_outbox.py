@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+import random
+import sys
+import time
+from datetime import datetime
+from gspread.exceptions import APIError
+import metrics
+
+# --- CONFIGURATION ---
+MASTER_WORKSHEET = "master_list"
+EMAIL_COLUMN = 3                 # 1-based column holding the row key in the sheet
+SYNC_BATCH_SIZE = 500            # Rows per append_rows call
+KEY_CACHE_TTL = 6 * 3600         # How long the cached set of sheet keys is trusted
+MAX_RETRIES = 5
+BACKOFF_BASE = 2.0
+RETRYABLE_STATUS = {429, 500, 502, 503}
+
+def log(message):
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    print(f"[{timestamp}] {message}")
+
+def _status_code(error):
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+class SheetsSync:
+    """
+    Drains the contact store's Sheets outbox into a worksheet.
+
+    Rows are uploaded in size-bounded batches. Anything whose key is already
+    in the sheet is dropped instead of appended, so re-running after a failed
+    or interrupted upload never creates duplicates. Quota (429) and 5xx
+    errors back off exponentially; other errors leave the rows queued.
+    """
+    def __init__(self, store, client=None, batch_size=SYNC_BATCH_SIZE, log=log):
+        self.store = store
+        self._client = client
+        self.batch_size = batch_size
+        self.log = log
+        self.uploaded = 0
+        self.deduped = 0
+
+    def client(self):
+        """The Sheets client is only created once there is something to upload."""
+        if self._client is None:
+            import sheets_client
+            self._client = sheets_client.GoogleSheetsClient()
+        return self._client
+
+    def _refresh_keys(self, worksheet_name, worksheet, force=False):
+        refreshed = float(self.store.get_meta(f'sheets_keys_refreshed:{worksheet_name}', 0))
+        if not force and time.time() - refreshed < KEY_CACHE_TTL:
+            return
+        keys = {value.strip().lower() for value in self._with_backoff(worksheet.col_values, EMAIL_COLUMN) if value.strip()}
+        self.store.replace_sheet_keys(worksheet_name, keys)
+        self.log(f"Cached {len(keys)} row keys already in '{worksheet_name}'.")
+
+    def _with_backoff(self, func, *args, **kwargs):
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                return func(*args, **kwargs)
+            except APIError as e:
+                if _status_code(e) not in RETRYABLE_STATUS or attempt == MAX_RETRIES:
+                    raise
+                delay = BACKOFF_BASE * (2 ** attempt) * (1 + random.random())
+                metrics.count('sheets_backoffs', status=_status_code(e))
+                self.log(f"  > Sheets API returned {_status_code(e)}. Backing off {delay:.1f}s.")
+                time.sleep(delay)
+
+    def sync(self, worksheet_name=MASTER_WORKSHEET):
+        """Uploads everything queued for one worksheet. Returns True if the outbox was emptied."""
+        if not self.store.outbox_count(worksheet_name):
+            return True
+        worksheet = self.client().get_worksheet(worksheet_name)
+        if not worksheet:
+            self.log("Skipping Google Sheets sync due to connection failure. Rows stay in the outbox.")
+            self._client = None  # Authenticate again next time instead of reusing a dead client.
+            return False
+
+        # An interrupted upload may have landed; re-read the sheet before sending again.
+        in_flight = self.store.outbox_in_flight(worksheet_name)
+        try:
+            self._refresh_keys(worksheet_name, worksheet, force=in_flight)
+        except APIError as e:
+            self.log(f"Google Sheets sync failed while reading existing rows: {e}")
+            return False
+
+        while True:
+            batch = self.store.outbox_batch(worksheet_name, self.batch_size)
+            if not batch:
+                return True
+            known = self.store.sheet_keys(worksheet_name, [key for _, key, _, _ in batch])
+            duplicates = [outbox_id for outbox_id, key, _, _ in batch if key in known]
+            fresh = [(outbox_id, key, row) for outbox_id, key, row, _ in batch if key not in known]
+            if duplicates:
+                self.store.complete_outbox(worksheet_name, duplicates, [])
+                self.deduped += len(duplicates)
+                metrics.count('sheets_rows_deduped', len(duplicates), worksheet=worksheet_name)
+            if not fresh:
+                continue
+            ids = [outbox_id for outbox_id, _, _ in fresh]
+            self.store.mark_outbox_sending(ids)
+            try:
+                self.log(f"Uploading {len(fresh)} new rows to '{worksheet_name}' sheet...")
+                with metrics.timer('sheets_upload', worksheet=worksheet_name):
+                    self._with_backoff(worksheet.append_rows, [row for _, _, row in fresh],
+                                       value_input_option='USER_ENTERED')
+            except Exception as e:
+                metrics.count('sheets_upload_errors', worksheet=worksheet_name)
+                self.store.fail_outbox(ids, str(e))
+                self.log(f"Google Sheets sync failed: {e}. {self.store.outbox_count(worksheet_name)} rows stay in the outbox.")
+                return False
+            self.store.complete_outbox(worksheet_name, ids, [key for _, key, _ in fresh])
+            self.uploaded += len(fresh)
+            metrics.count('sheets_rows_uploaded', len(fresh), worksheet=worksheet_name)
+
+def main():
+    import contact_store
+    import outlet_registry
+    store = contact_store.ContactStore()
+    syncer = SheetsSync(store)
+    worksheets = outlet_registry.OutletRegistry().worksheets()
+    queued = sum(store.outbox_count(worksheet) for worksheet in worksheets)
+    log(f"--- Syncing Google Sheets outbox ({queued} rows queued) ---")
+    ok = all([syncer.sync(worksheet) for worksheet in worksheets])
+    log(f"Uploaded {syncer.uploaded} rows, skipped {syncer.deduped} already in the sheet.")
+    store.close()
+    try:
+        metrics.registry.write('sync')
+    except OSError as e:
+        log(f"Could not write metrics files: {e}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
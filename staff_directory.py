@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+import requests
+from bs4 import BeautifulSoup
+import email_finder
+import email_formats
+import metrics
+import names
+
+# --- CONFIGURATION ---
+REFRESH_INTERVAL = 7 * 24 * 3600    # Staff pages change slowly; re-harvest weekly.
+RETRY_INTERVAL = 24 * 3600          # An outlet with no usable directory is looked at again daily.
+MAX_DIRECTORY_PAGES = 5             # Directory pages followed per outlet (homepage links + pagination).
+HARVEST_CONCURRENCY = 4
+FETCH_TIMEOUT = 15
+# Links on a homepage that probably lead to a staff list.
+DIRECTORY_LINK_TEXT = re.compile(r'\b(staff|our team|newsroom|contact us|masthead|our journalists|'
+                                 r'reporters|authors|who we are)\b', re.IGNORECASE)
+DIRECTORY_LINK_PATH = re.compile(r'/(staff|team|newsroom|contact|contact-us|masthead|authors|people|'
+                                 r'about-us|who-we-are)(/|\.html?)?$', re.IGNORECASE)
+NEXT_PAGE_TEXT = re.compile(r'^\s*(next|older|more|›|»)', re.IGNORECASE)
+# Shared inboxes are not a person's address.
+GENERIC_MAILBOXES = {'info', 'news', 'newsroom', 'tips', 'newstips', 'editor', 'editors', 'letters', 'contact',
+                     'advertising', 'ads', 'sales', 'subscriptions', 'circulation', 'help', 'support', 'hello',
+                     'feedback', 'admin', 'webmaster', 'office', 'press', 'media', 'events', 'jobs', 'careers'}
+NAME_PATTERN = re.compile(r"[A-ZÀ-Ý][\w'’.-]+(?:\s+[A-ZÀ-Ý][\w'’.-]+){1,3}")
+
+def _belongs_to(name, email):
+    """True when an address plausibly belongs to the name (jane.doe@, jdoe@, doe@ ...)."""
+    first, last = names.split_name(name)
+    local_part = email.split('@')[0].lower()
+    if email_formats.detect_formats(local_part, first, last):
+        return True
+    first, last = email_formats.name_parts(first, last)
+    return (len(last) >= 3 and last in local_part) or (len(first) >= 3 and local_part.startswith(first))
+
+def _names_near(link):
+    """
+    Candidate names for a mailto: link: its own text or title, then each
+    piece of text in the blocks around it (a card's heading, not "Jane Doe
+    Reporter Email" run together).
+    """
+    for text in (link.get_text(' ', strip=True), link.get('title'), link.get('aria-label')):
+        yield from NAME_PATTERN.findall(text or '')
+    node = link
+    for _ in range(3):
+        node = node.parent
+        if node is None:
+            return
+        for text in node.stripped_strings:
+            yield from NAME_PATTERN.findall(re.sub(r'\S+@\S+', ' ', text))
+
+def extract_staff(soup):
+    """Returns {name: email} for every person on a staff / contact page."""
+    staff = {}
+    for person in email_finder._json_ld_people(soup):
+        email = email_finder._clean_email(person.get('email'))
+        name = names.clean_byline(person.get('name') if isinstance(person.get('name'), str) else '')
+        if email and name and _belongs_to(name, email):
+            staff.setdefault(name, email.lower())
+    for link in soup.find_all('a', href=True):
+        if not link['href'].lower().startswith('mailto:'):
+            continue
+        email = email_finder._clean_email(link['href'])
+        if not email or email.split('@')[0].lower() in GENERIC_MAILBOXES:
+            continue
+        for candidate in _names_near(link):
+            name = names.clean_byline(candidate)
+            if name and _belongs_to(name, email):
+                staff.setdefault(name, email.lower())
+                break
+    return staff
+
+def directory_links(soup, page_url):
+    """Same-site links on a page that look like they lead to a staff directory."""
+    host = urlsplit(page_url).netloc
+    links = []
+    for link in soup.find_all('a', href=True):
+        url = urljoin(page_url, link['href']).split('#')[0]
+        if urlsplit(url).netloc != host or url in links:
+            continue
+        if DIRECTORY_LINK_TEXT.search(link.get_text(' ', strip=True)) or DIRECTORY_LINK_PATH.search(urlsplit(url).path):
+            links.append(url)
+    return links
+
+def next_page_link(soup, page_url):
+    link = soup.find('a', rel='next', href=True) or soup.find('a', href=True, string=NEXT_PAGE_TEXT)
+    return urljoin(page_url, link['href']) if link else None
+
+class StaffDirectory:
+    """
+    Name -> email index built from outlets' staff and contact pages.
+
+    One crawl of a newsroom's directory can answer hundreds of byline
+    lookups, so EmailFinder checks here before fetching any article. Each
+    outlet is re-harvested on a schedule; an outlet can list its directory
+    pages as "staff_urls" in outlets.json, otherwise they are found from
+    links on its homepage.
+    """
+    def __init__(self, store, session, log=print, scheduler=None):
+        self.store = store
+        self.session = session
+        self.scheduler = scheduler
+        self.log = log
+        self._indexes = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        indexes = {}
+        for outlet, name, email in self.store.staff_rows():
+            key = names.name_key(name)
+            if key:
+                indexes.setdefault(outlet, {})[key] = email
+        with self._lock:
+            self._indexes = indexes
+
+    def find(self, outlet_name, author_name):
+        """
+        The harvested address for a byline at this outlet, or None. A hit is
+        saved as a verified contact, so the names must be the same (case,
+        accents and middle initials aside): no nicknames or initials.
+        """
+        key = names.name_key(author_name)
+        with self._lock:
+            return self._indexes.get(outlet_name, {}).get(key) if key else None
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(emails) for emails in self._indexes.values())
+
+    # --- Harvesting ---
+    def due(self, outlets, now=None):
+        now = now or time.time()
+        return [o for o in outlets if float(self.store.get_meta(f"staff_next_harvest:{o['outlet']}", 0)) <= now]
+
+    def _soup(self, url):
+        if self.scheduler:
+            self.scheduler.acquire(url)
+        response = self.session.get(url, timeout=FETCH_TIMEOUT)
+        response.raise_for_status()
+        return BeautifulSoup(response.content, 'lxml')
+
+    def harvest(self, outlet):
+        """Crawls one outlet's directory pages. Returns ({name: email}, pages fetched)."""
+        pages = list(outlet.get('staff_urls') or [])
+        if not pages:
+            pages = directory_links(self._soup(outlet['url']), outlet['url'])
+        staff, visited = {}, set()
+        while pages and len(visited) < MAX_DIRECTORY_PAGES:
+            url = pages.pop(0)
+            if url in visited:
+                continue
+            visited.add(url)
+            if self.scheduler and not self.scheduler.allowed(url):
+                continue
+            try:
+                soup = self._soup(url)
+            except requests.exceptions.RequestException as e:
+                self.log(f"  -> [directory] Could not fetch {url}: {e}")
+                continue
+            found = extract_staff(soup)
+            for name, email in found.items():
+                staff.setdefault(name, email)
+            next_url = next_page_link(soup, url)
+            if found and next_url and next_url not in visited:
+                pages.insert(0, next_url)
+        return staff, len(visited)
+
+    def _refresh_outlet(self, outlet):
+        with metrics.timer('staff_harvest', outlet=outlet['outlet']):
+            try:
+                staff, fetched = self.harvest(outlet)
+            except requests.exceptions.RequestException as e:
+                return outlet, {}, 0, e
+        return outlet, staff, fetched, None
+
+    def refresh(self, outlets):
+        """Re-harvests every outlet whose directory is due, then reloads the index."""
+        due = self.due(outlets)
+        if not due:
+            return
+        self.log(f"Harvesting staff directories for {len(due)} outlets...")
+        with ThreadPoolExecutor(max_workers=HARVEST_CONCURRENCY) as executor:
+            results = list(executor.map(self._refresh_outlet, due))
+        for outlet, staff, fetched, error in results:
+            if error:
+                self.log(f"  -> [directory] {outlet['outlet']}: {error}")
+            elif staff:
+                self.log(f"  -> [directory] {outlet['outlet']}: {len(staff)} staff emails from {fetched} pages.")
+            if staff:
+                self.store.replace_staff(outlet['outlet'], staff)
+            metrics.count('staff_harvested', len(staff), outlet=outlet['outlet'])
+            interval = REFRESH_INTERVAL if staff else RETRY_INTERVAL
+            self.store.set_meta(f"staff_next_harvest:{outlet['outlet']}", str(time.time() + interval))
+        self.load()
+        self.log(f"Staff directory holds {len(self)} emails.")
@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
-import csv
-import quickemailverification
-import time
 from datetime import datetime
-import signal
 import os
-import sheets_client
+import sys
+import sheets_outbox
+import email_formats
+import contact_store
+import validation_engine
+import domain_check
+import metrics
+import outlet_registry
 
 # --- HELPER FUNCTION ---
 def log(message, end='\n'):
@@ -14,121 +17,172 @@ def log(message, end='\n'):
     print(f"[{timestamp}] {message}", end=end)
 
 # --- CONFIGURATION ---
-MASTER_LIST_FILE = 'master_journalist_list.csv'
-PENDING_FILE = 'pending_verification.csv'
-BLACKLIST_FILE = 'blacklist_emails.txt'
 API_KEY = os.getenv('EMAIL_VERIFY_KEY') # It can re-use the same variable
-if not API_KEY:
-    log("CRITICAL ERROR: EMAIL_VERIFY_KEY environment variable not set.")
-    exit()CREDITS_TO_USE = 100
+# Maximum verifier credits one run may spend.
+CREDIT_BUDGET = int(os.getenv('VERIFY_CREDIT_BUDGET', 100))
+VERIFY_WORKERS = int(os.getenv('VERIFY_WORKERS', validation_engine.DEFAULT_WORKERS))
+VERIFY_RATE_PER_SEC = float(os.getenv('VERIFY_RATE_PER_SEC', validation_engine.DEFAULT_RATE_PER_SEC))
+WRITE_BATCH_SIZE = 20
+# Guesses the format model scores below this are left in the queue unverified.
+MIN_GUESS_CONFIDENCE = float(os.getenv('MIN_GUESS_CONFIDENCE', '0.1'))
 
-# --- TIMEOUT HANDLER for API calls ---
-class TimeoutError(Exception):
-    pass
+def select_rows(store, format_model, screen, limit):
+    """
+    Pages through the pending queue oldest-first and returns up to `limit`
+    rows worth a verifier credit, plus counts of what was filtered out.
+    Addresses that fail syntax or whose domain takes no mail are blacklisted,
+    catch-all domains are parked (see ContactStore.requeue_parked), and
+    low-confidence guesses stay queued.
+    """
+    selected = []
+    filtered = {'low_confidence': 0, domain_check.BAD_SYNTAX: 0, domain_check.NO_MAIL: 0,
+                domain_check.CATCH_ALL: 0, domain_check.DNS_ERROR: 0}
+    after_id = 0
+    while len(selected) < limit:
+        page = store.pending_rows(after_id=after_id)
+        if not page:
+            break
+        dropped, parked = [], []
+        for pending_id, row in page:
+            after_id = pending_id
+            status = screen.check(row[2])
+            if status != domain_check.OK:
+                filtered[status] += 1
+                if status in (domain_check.BAD_SYNTAX, domain_check.NO_MAIL):
+                    dropped.append(pending_id)
+                elif status == domain_check.CATCH_ALL:
+                    parked.append(pending_id)
+                continue
+            if format_model.confidence(row[7], row[0], row[1], row[2]) < MIN_GUESS_CONFIDENCE:
+                filtered['low_confidence'] += 1
+                continue
+            selected.append((pending_id, row))
+            if len(selected) == limit:
+                break
+        store.resolve_pending(invalid_ids=dropped)
+        store.set_pending_status(parked, domain_check.CATCH_ALL)
+    return selected, filtered
 
-def timeout_handler(signum, frame):
-    raise TimeoutError("API call timed out")
-
-# Set the signal handler for the alarm signal (works on Linux)
-signal.signal(signal.SIGALRM, timeout_handler)
-
-def main():
-    log("--- Starting Pending Email Validator (Local with Cloud Sync) ---")
-    
+def validate(store, syncer, registry=None, api_key=API_KEY, verifier=None, resolver=None):
+    """
+    Verifies one budget's worth of pending guesses and syncs the valid ones.
+    The store and SheetsSync are the caller's, so `journo run-all` can share
+    them with the scrape; `verifier` and `resolver` replace the API client
+    and DNS (the pipeline benchmark passes fakes). Returns the credits
+    spent, or None if the verifier could not be set up.
+    """
     try:
-        client = quickemailverification.Client(API_KEY)
-        verifier = client.quickemailverification()
+        verifier = verifier or validation_engine.QuickEmailVerifier(api_key)
     except Exception as e:
         log(f"Failed to initialize API client: {e}")
-        return
+        return None
 
-    try:
-        with open(PENDING_FILE, 'r', newline='', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            header = next(reader)
-            pending_rows = list(reader)
-    except (FileNotFoundError, StopIteration):
-        log("Pending verification file is empty or not found. Nothing to do.")
-        return
-        
-    if not pending_rows:
-        log("Pending verification file is empty. Nothing to do.")
-        return
-
-    log(f"Found {len(pending_rows)} journalists in the pending queue.")
-    
-    rows_to_process = pending_rows[:CREDITS_TO_USE]
-    remaining_rows = pending_rows[CREDITS_TO_USE:]
-    
-    validated_rows = []
-    api_calls = 0
-
-    for row in rows_to_process:
-        if len(row) < 3:
-            continue
-            
-        email_to_check = row[2]
+    pending_count = store.count('pending')
+    if not pending_count:
+        log("Pending verification queue is empty. Nothing to do.")
+        return 0
+
+    log(f"Found {pending_count} journalists in the pending queue.")
+
+    # A catch-all verdict is only trusted for CATCH_ALL_TTL; after that its rows get another look.
+    requeued = store.requeue_parked(domain_check.CATCH_ALL)
+    if requeued:
+        log(f"Re-queued {requeued} parked guesses whose catch-all domain is due a re-check.")
+
+    # Spend credits only on guesses the format model believes in.
+    format_model = email_formats.EmailFormatModel.from_store(store)
+    screen = domain_check.DomainScreen(store, resolver=resolver)
+    rows_to_process, filtered = select_rows(store, format_model, screen, CREDIT_BUDGET)
+    log(f"Pre-screen ({screen.lookups} DNS lookups): "
+        f"{filtered[domain_check.BAD_SYNTAX]} bad syntax and {filtered[domain_check.NO_MAIL]} dead domains blacklisted, "
+        f"{filtered[domain_check.CATCH_ALL]} on catch-all domains parked, "
+        f"{filtered[domain_check.DNS_ERROR]} with DNS errors and "
+        f"{filtered['low_confidence']} low-confidence guesses (below {MIN_GUESS_CONFIDENCE}) left in the queue.")
+    for reason, filtered_count in filtered.items():
+        metrics.count('prescreen_filtered', filtered_count, reason=reason)
+    metrics.count('dns_lookups', screen.lookups)
+
+    budget = validation_engine.CreditBudget(CREDIT_BUDGET)
+    engine = validation_engine.ValidationEngine(verifier, budget, workers=VERIFY_WORKERS,
+                                                rate_per_sec=VERIFY_RATE_PER_SEC, log=log)
+    log(f"Verifying {len(rows_to_process)} emails with {VERIFY_WORKERS} workers "
+        f"at up to {VERIFY_RATE_PER_SEC}/sec (budget: {CREDIT_BUDGET} credits).")
+
+    registry = registry or outlet_registry.OutletRegistry()
+    validated_count = 0
+    valid_ids, valid_rows, invalid_ids, catch_all_ids = [], [], [], []
+
+    def write_batch():
+        # One transaction per batch: new contacts with their Sheets outbox rows, the
+        # blacklist and parked rows. A crash loses at most a few calls.
+        store.resolve_pending(valid_ids, invalid_ids, outbox=registry.group_by_worksheet(valid_rows),
+                              parked={domain_check.CATCH_ALL: catch_all_ids})
+        for batch in (valid_ids, valid_rows, invalid_ids, catch_all_ids):
+            batch.clear()
+
+    for pending_id, row, body, error in engine.validate(rows_to_process):
         full_name = f"{row[0]} {row[1]}"
-        log(f"Verifying {full_name}: {email_to_check}...", end='')
-        
-        signal.alarm(15)
-        try:
-            response = verifier.verify(email_to_check)
-            api_calls += 1
-            result = response.body.get('result')
-            
+        if error:
+            metrics.count('validation_results', result='error', outlet=row[7])
+            log(f"{full_name}: {row[2]} API ERROR/TIMEOUT: {error}. Row left in queue.")
+            continue
+        result = body.get('result')
+        domain = row[2].rsplit('@', 1)[1]
+        if body.get('reason') in ('invalid_domain', 'no_mx_record'):
+            store.put_domain(domain.lower(), domain_check.NO_MAIL, [], domain_check.DOMAIN_TTL)
+        if result != 'valid' and str(body.get('accept_all')).lower() == 'true':
+            # The server accepts everything; remember that instead of paying to learn it again.
+            log(f"{full_name}: {row[2]} UNKNOWN (catch-all domain). Parking row.")
+            screen.mark_catch_all(domain)
+            catch_all_ids.append(pending_id)
+            metrics.count('validation_results', result='catch_all', outlet=row[7])
+        else:
+            metrics.count('validation_results', result='valid' if result == 'valid' else 'invalid', outlet=row[7])
             if result == 'valid':
-                print(" VALID ✅")
-                validated_rows.append(row)
+                log(f"{full_name}: {row[2]} VALID ✅")
+                valid_rows.append(row)
+                valid_ids.append(pending_id)
+                validated_count += 1
             else:
-                print(f" INVALID ({result}) ❌. Blacklisting email.")
-                with open(BLACKLIST_FILE, 'a', encoding='utf-8') as f_out:
-                    f_out.write(email_to_check + '\n')
-            time.sleep(1)
-        except (TimeoutError, Exception) as e:
-            print(f" API ERROR/TIMEOUT: {e}. Row returned to queue.")
-            remaining_rows.insert(0, row)
-            continue
-        finally:
-            signal.alarm(0)
-
-    # --- LOCAL FILE WRITING ---
-    if validated_rows:
-        log(f"\nFound {len(validated_rows)} VALID emails. Appending to local master list.")
-        # Check if master list needs a header
-        write_header = not os.path.exists(MASTER_LIST_FILE) or os.path.getsize(MASTER_LIST_FILE) == 0
-        with open(MASTER_LIST_FILE, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            if write_header:
-                writer.writerow(header)
-            writer.writerows(validated_rows)
+                log(f"{full_name}: {row[2]} INVALID ({result}) ❌. Blacklisting email.")
+                invalid_ids.append(pending_id)
+        if len(valid_ids) + len(invalid_ids) + len(catch_all_ids) >= WRITE_BATCH_SIZE:
+            write_batch()
+
+    write_batch()
+    if validated_count:
+        log(f"\nFound {validated_count} VALID emails. Moved them to the contact store and the Sheets outbox.")
 
     # --- GOOGLE SHEETS SYNC ---
-    if validated_rows:
-        log("\nConnecting to Google Sheets to sync newly validated journalists...")
-
-    client = sheets_client.GoogleSheetsClient()
-
-    master_ws = client.get_worksheet("master_list")
-    
-    if master_ws:
-        try:
-            log(f"Uploading {len(validated_rows)} new rows to 'master_list' sheet...")
-            master_ws.append_rows(validated_rows, value_input_option='USER_ENTERED')
-            log("Google Sheets sync successful.")
-            except Exception as e:
-                log(f"Google Sheets sync failed: {e}")
-        else:
-            log("Skipping Google Sheets sync due to connection failure.")
+    log("\nSyncing newly validated journalists to Google Sheets...")
+    uploaded, deduped = syncer.uploaded, syncer.deduped
+    for worksheet in registry.worksheets():
+        syncer.sync(worksheet)
+    log(f"Uploaded {syncer.uploaded - uploaded} rows, skipped {syncer.deduped - deduped} already in the sheet.")
 
-    # Overwrite the pending file with the remaining rows
-    log(f"\nUpdating pending queue. {len(remaining_rows)} journalists remaining.")
-    with open(PENDING_FILE, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(header)
-        writer.writerows(remaining_rows)
-        
-    log(f"\n--- Validator Finished. API calls made: {api_calls} ---")
+    log(f"\nPending queue now holds {store.count('pending')} journalists.")
+    metrics.count('verifier_credits_spent', budget.spent)
+    return budget.spent
+
+def main():
+    log("--- Starting Pending Email Validator (Local with Cloud Sync) ---")
+    if not API_KEY:
+        log("CRITICAL ERROR: EMAIL_VERIFY_KEY environment variable not set.")
+        return 1
+    store = contact_store.ContactStore()
+    store.import_csvs()
+    try:
+        spent = validate(store, sheets_outbox.SheetsSync(store, log=log))
+    finally:
+        store.close()
+    if spent is None:
+        return 1
+    try:
+        log(f"Metrics written to {', '.join(metrics.registry.write('validate'))}")
+    except OSError as e:
+        log(f"Could not write metrics files: {e}")
+    log(f"\n--- Validator Finished. API credits spent: {spent} ---")
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
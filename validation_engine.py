@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+import metrics
+from rate_limit import TokenBucket
+
+# --- CONFIGURATION ---
+DEFAULT_WORKERS = 8
+DEFAULT_RATE_PER_SEC = 5      # Stay under the verifier's per-second limit.
+DEFAULT_TIMEOUT = 15          # Per-call HTTP timeout, no signals involved.
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0
+REMAINING_CREDITS_HEADER = 'X-QEV-Remaining-Credits'
+
+class TransientError(Exception):
+    """A verifier failure worth retrying (timeouts, 429s, 5xx)."""
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class BudgetExhausted(Exception):
+    pass
+
+class CreditBudget:
+    """Counts credits across worker threads. A call reserves one; calls that never reach the API refund it."""
+    def __init__(self, credits):
+        self.remaining = credits
+        self.spent = 0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            self.spent += 1
+            return True
+
+    def refund(self):
+        with self._lock:
+            self.remaining += 1
+            self.spent -= 1
+
+    def cap(self, provider_remaining):
+        """Never plan to spend more than the provider says the account has left."""
+        with self._lock:
+            self.remaining = min(self.remaining, provider_remaining)
+
+class QuickEmailVerifier:
+    """Wraps the quickemailverification client so every call has a real timeout and classified errors."""
+    def __init__(self, api_key, timeout=DEFAULT_TIMEOUT):
+        import quickemailverification
+        from quickemailverification.error import ClientError
+        self._client_error = ClientError
+        self._verifier = quickemailverification.Client(api_key, {'timeout': timeout}).quickemailverification()
+        self.remaining_credits = None
+
+    def __call__(self, email):
+        """Returns the verifier's response body ('result', 'reason', 'accept_all', ...)."""
+        try:
+            response = self._verifier.verify(email, {})
+        except requests.exceptions.RequestException as e:
+            raise TransientError(f"{type(e).__name__}: {e}")
+        except self._client_error as e:
+            if e.code >= 500:
+                raise TransientError(f"HTTP {e.code}")
+            raise
+        if response.code == 429:
+            retry_after = response.headers.get('Retry-After')
+            raise TransientError("HTTP 429 rate limited", float(retry_after) if retry_after else None)
+        if response.code >= 400:
+            raise RuntimeError(f"HTTP {response.code}: {response.body}")
+        remaining = response.headers.get(REMAINING_CREDITS_HEADER)
+        if remaining is not None and remaining.isdigit():
+            self.remaining_credits = int(remaining)
+        return response.body
+
+class ValidationEngine:
+    """
+    Verifies many addresses at once: a worker pool, a shared token bucket so
+    the pool as a whole respects the provider's rate limit, a credit budget,
+    and retry with exponential backoff on transient errors.
+    """
+    def __init__(self, verify, budget, workers=DEFAULT_WORKERS, rate_per_sec=DEFAULT_RATE_PER_SEC,
+                 max_retries=MAX_RETRIES, log=print):
+        self.verify = verify
+        self.budget = budget
+        self.workers = max(1, workers)
+        self.bucket = TokenBucket(rate_per_sec)
+        self.max_retries = max_retries
+        self.log = log
+
+    def _verify_with_retries(self, email):
+        for attempt in range(self.max_retries + 1):
+            if not self.budget.reserve():
+                raise BudgetExhausted("credit budget exhausted")
+            self.bucket.acquire()
+            try:
+                with metrics.timer('verifier_call'):
+                    result = self.verify(email)
+            except TransientError as e:
+                self.budget.refund()
+                metrics.count('verifier_transient_errors')
+                if attempt == self.max_retries:
+                    raise
+                delay = e.retry_after or BACKOFF_BASE * (2 ** attempt) * (1 + random.random())
+                self.log(f"  -> {email}: {e}. Retrying in {delay:.1f}s.")
+                time.sleep(delay)
+                continue
+            except Exception:
+                self.budget.refund()
+                raise
+            provider_remaining = getattr(self.verify, 'remaining_credits', None)
+            if provider_remaining is not None:
+                self.budget.cap(provider_remaining)
+            return result
+
+    def validate(self, rows):
+        """
+        Takes (pending_id, row) pairs and yields (pending_id, row, result, error)
+        as each call finishes. `result` is None when the row should stay queued.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self._verify_with_retries, row[2]): (pending_id, row)
+                       for pending_id, row in rows}
+            for future in as_completed(futures):
+                pending_id, row = futures[future]
+                try:
+                    yield pending_id, row, future.result(), None
+                except Exception as e:
+                    yield pending_id, row, None, e